@@ -0,0 +1,469 @@
+"""Agents qui décident des actions d'un joueur à la place d'un humain.
+
+Un agent observe la partie et retourne la liste des actions du tour, sous forme de tuples
+(nom de méthode de Player, arguments...). Game.process_player_turn les fait jouer une à une par
+Game.perform_action : elles sont donc journalisées et rejouables comme celles d'un joueur.
+
+    game.set_agent(player, GreedyAgent())
+"""
+import io
+import logging
+import math
+import pickle
+import random
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from models import EventLog, Infrastructure, PathFinder, RandomStreams
+
+
+class Agent:
+    """Interface commune des agents."""
+
+    def decide(self, game, player):
+        """Retourne la liste des actions que player joue ce tour."""
+        raise NotImplementedError
+
+
+@lru_cache(maxsize=None)
+def infrastructure_value(infrastructure_type):
+    """Retourne le gain net moyen par tour d'un type d'infrastructure (production moins entretien)."""
+    production, upkeep_cost = Infrastructure.DEFAULT_VALUES.get(infrastructure_type, (0, 0))
+    if infrastructure_type in Infrastructure.ALTERNATING_TYPES:
+        production /= 2  # Ne produit qu'un tour sur deux
+    return production - upkeep_cost
+
+
+class GreedyAgent(Agent):
+    """Bot glouton : joue à chaque tour les actions les mieux notées, sans regarder plus loin.
+
+    - construction : l'infrastructure la plus rentable parmi ses territoires, s'il peut la payer ;
+    - attaque : les combats gagnés avec une probabilité d'au moins min_win_probability, notés par
+      pertes attendues infligées moins pertes attendues subies (battle_odds, mémorisé) ;
+    - guerre : déclarée au propriétaire de la meilleure cible s'il n'est pas déjà un ennemi ;
+    - déplacement : les piles sans cible avancent vers les armées des autres joueurs.
+
+    Le meilleur choix de construction de chaque territoire ne dépend que du territoire : il est
+    calculé une fois et gardé en cache.
+    """
+    INFRASTRUCTURE_TYPES = ('Factory', 'Port', 'Oil Exploitation', 'Coal Factory')
+    MAX_BUILD_COST = 7500  # Coût maximal d'une construction (voir Player.build_infrastructure)
+
+    def __init__(self, min_win_probability=0.6):
+        self.min_win_probability = min_win_probability  # Chance de victoire minimale pour attaquer
+        self.build_choices = {}  # Meilleure construction (valeur, type) par identifiant de territoire
+
+    def decide(self, game, player):
+        actions = []
+        military_points = player.action_points['military']
+
+        if player.action_points['bonus'] > 0 and player.resources['money'] >= self.MAX_BUILD_COST:
+            build = self.choose_build(player)
+            if build is not None:
+                actions.append(('build_infrastructure',) + build)
+
+        engagements = self.score_engagements(player)
+        enemies = set(player.war_declarations)
+        if engagements and player.action_points['diplomatic'] >= 2:
+            target = engagements[0][2].owner
+            if target not in enemies:
+                actions.append(('declare_war', target))
+                enemies.add(target)
+
+        engaged = set()
+        for _, army, enemy_army in engagements:
+            if military_points == 0:
+                break
+            if army in engaged or enemy_army in engaged or enemy_army.owner not in enemies:
+                continue
+            actions.append(('attack', army, enemy_army))
+            engaged.add(army)
+            engaged.add(enemy_army)
+            military_points -= 1
+
+        if military_points:
+            rivals = [other for other in game.players if other is not player and other not in player.allies]
+            for army, destination in self.choose_moves(player, engaged, rivals):
+                if military_points == 0:
+                    break
+                actions.append(('move_unit', army, destination))
+                military_points -= 1
+        return actions
+
+    def choose_build(self, player):
+        """Retourne (territoire, type) de la construction la plus rentable du joueur, ou None."""
+        best_value, best_build = 0, None
+        for territory in player.territories:
+            choice = self.build_choices.get(territory.territory_id)
+            if choice is None:
+                choice = max(
+                    (infrastructure_value(infrastructure_type), infrastructure_type)
+                    for infrastructure_type in self.INFRASTRUCTURE_TYPES
+                    if territory.can_build_infrastructure(infrastructure_type)
+                )
+                self.build_choices[territory.territory_id] = choice
+            if choice[0] > best_value:
+                best_value, best_build = choice[0], (territory, choice[1])
+        return best_build
+
+    def score_engagements(self, player):
+        """Retourne les combats favorables (score, armée, armée ennemie), du meilleur au moins bon."""
+        engagements = []
+        for army in player.armies:
+            if army.has_moved_this_turn or army.location is None:
+                continue
+            for territory in (army.location, *army.location.adjacent_territories):
+                for enemy_army in territory.armies:
+                    if enemy_army.owner is player or enemy_army.owner in player.allies:
+                        continue
+                    win_probability, losses, enemy_losses = army.battle_odds(enemy_army)
+                    if win_probability >= self.min_win_probability:
+                        engagements.append((enemy_losses - losses, army, enemy_army))
+        engagements.sort(key=lambda engagement: engagement[0], reverse=True)
+        return engagements
+
+    def choose_moves(self, player, engaged, rivals):
+        """Retourne les déplacements (armée, destination) des piles sans combat ce tour.
+
+        Une pile rejoint le territoire atteignable (adjacent ou du même pays) qui touche le plus
+        d'armées rivales ; si aucun ne fait mieux que sa position, elle avance d'une case vers la
+        pile rivale la plus proche, après avoir quitté la capitale (hors carte) si besoin.
+        """
+        def front_value(territory):
+            return sum(
+                enemy_army.owner in rivals
+                for neighbour in territory.adjacent_territories
+                for enemy_army in neighbour.armies
+            )
+
+        targets = [
+            enemy_army.location
+            for rival in rivals
+            for enemy_army in rival.armies
+            if enemy_army.location is not None and enemy_army.location.paths is not None
+        ]
+        moves = []
+        for army in player.armies:
+            location = army.location
+            if army in engaged or army.has_moved_this_turn or location is None:
+                continue
+            value, destination = max(
+                ((front_value(territory), territory)
+                 for territory in (*location.adjacent_territories, *player.territories)
+                 if territory is not location),
+                key=lambda candidate: candidate[0],
+                default=(0, None)
+            )
+            if value > front_value(location):
+                moves.append((army, destination))
+            elif location.paths is None:
+                destination = next((territory for territory in player.territories if territory.paths), None)
+                if destination is not None:
+                    moves.append((army, destination))
+            elif targets and location.paths is not None:
+                distances = [(location.paths.distance(location, target), target) for target in targets]
+                distances = [(distance, target) for distance, target in distances if distance]
+                if distances:
+                    path = army.path_to(min(distances, key=lambda candidate: candidate[0])[1])
+                    moves.append((army, path[1]))
+        return moves
+
+
+class ZobristHasher:
+    """Empreinte Zobrist d'une position, vue du joueur qui doit jouer.
+
+    La position est résumée par des éléments (territoires possédés, piles par paliers de force,
+    nombre de flottes, argent par tranches, guerres déclarées) ; chaque élément reçoit une clé
+    aléatoire de 64 bits et l'empreinte est le XOR des clés présentes. Deux parties différentes qui
+    mènent à la même position (transposition) ont donc la même empreinte.
+
+    Les territoires ne sont pas parcourus : chaque joueur tient à jour Player.territory_key (XOR des
+    clés de ses territoires, modifié à chaque gain ou perte), multiplié ici par une clé impaire du
+    joueur. Le calcul reste proportionnel au nombre de piles d'armées, pas à la taille de la carte.
+    """
+    MONEY_STEP = 5000  # Largeur des tranches d'argent
+    MASK = (1 << 64) - 1  # Les empreintes restent sur 64 bits
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)  # Tirage des clés
+        self.keys = {}  # Élément -> clé de 64 bits
+
+    def key(self, feature):
+        """Retourne la clé d'un élément (tirée à sa première apparition)."""
+        key = self.keys.get(feature)
+        if key is None:
+            key = self.keys[feature] = self.rng.getrandbits(64)
+        return key
+
+    def hash(self, game, player):
+        """Retourne l'empreinte de la partie au moment où player doit jouer."""
+        key = self.key
+        digest = key(('to_move', player.player_id))
+        for other in game.players:
+            player_id = other.player_id
+            digest ^= (other.territory_key * (key(('territories', player_id)) | 1)) & self.MASK
+            for army in other.armies:
+                if army.location is not None:
+                    digest ^= key(('army', player_id, army.location.territory_id, army.strength.bit_length()))
+            digest ^= key(('fleets', player_id, len(other.fleets)))
+            digest ^= key(('money', player_id, int(other.resources['money'] // self.MONEY_STEP)))
+            for enemy in other.war_declarations:
+                digest ^= key(('war', player_id, enemy.player_id))
+        return digest
+
+
+class SearchNode:
+    """Position de la table de transposition : les tours candidats du joueur et leurs statistiques."""
+    __slots__ = ('plans', 'visits', 'edge_visits', 'edge_values', 'generation')
+
+    def __init__(self, plans, generation):
+        self.plans = plans  # Tours candidats, actions encodées (voir Game.encode_argument)
+        self.visits = 0  # Nombre de passages par la position
+        self.edge_visits = [0] * len(plans)  # Nombre d'essais de chaque tour
+        self.edge_values = [0.0] * len(plans)  # Somme des récompenses de chaque tour
+        self.generation = generation  # Dernière décision pendant laquelle la position a servi
+
+    def select(self, exploration):
+        """Retourne l'indice du tour à essayer (UCT : les tours jamais essayés d'abord)."""
+        log_visits = math.log(self.visits + 1)
+        best_score, best_edge = -1.0, 0
+        for edge, visits in enumerate(self.edge_visits):
+            if visits == 0:
+                return edge
+            score = self.edge_values[edge] / visits + exploration * math.sqrt(log_visits / visits)
+            if score > best_score:
+                best_score, best_edge = score, edge
+        return best_edge
+
+    def update(self, edge, reward):
+        """Ajoute le résultat d'une simulation passée par le tour edge."""
+        self.visits += 1
+        self.edge_visits[edge] += 1
+        self.edge_values[edge] += reward
+
+
+class SearchPickler(pickle.Pickler):
+    """Copie une partie pour la recherche, sans son journal, ses agents ni les drapeaux des joueurs.
+
+    Les caches de plus courts chemins (PathFinder.searches, rangés par identifiants) ne sont pas
+    copiés : toutes les copies partagent ceux de la partie d'origine, listés dans shared. Les flux
+    aléatoires non plus : chaque copie reçoit les siens, tirés d'une nouvelle graine.
+    """
+    def __init__(self, file, game):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.game = game
+        self.flags = {id(player.flag) for player in game.players if player.flag is not None}
+        self.shared = []  # Objets partagés avec les copies, passés à SearchUnpickler
+
+    def persistent_id(self, obj):
+        if obj is self.game.game_log:
+            return 'game_log'
+        if obj is self.game.agents:
+            return 'agents'
+        if obj is self.game.rng:
+            return 'rng'
+        if id(obj) in self.flags:
+            return 'flag'
+        if type(obj) is OrderedDict:
+            for index, shared in enumerate(self.shared):
+                if obj is shared:
+                    return 'shared', index
+        return None
+
+    def reducer_override(self, obj):
+        if type(obj) is not PathFinder or obj.key is None:
+            return NotImplemented
+        # Contrairement à PathFinder.__getstate__ (sauvegardes), le cache est gardé et partagé
+        self.shared.append(obj.searches)
+        return object.__new__, (PathFinder,), dict(obj.__dict__, nodes_by_key=None)
+
+
+class SearchUnpickler(pickle.Unpickler):
+    """Recrée une copie de recherche, avec un journal muet, sans agents ni drapeaux."""
+    def __init__(self, file, shared=(), seed=None):
+        super().__init__(file)
+        self.shared = shared  # Objets partagés avec la partie d'origine (SearchPickler.shared)
+        self.seed = seed  # Graine des flux aléatoires de la copie
+
+    def persistent_load(self, pid):
+        if pid == 'game_log':
+            return EventLog(level=logging.CRITICAL + 1, capacity=0)
+        if pid == 'rng':
+            return RandomStreams(self.seed)
+        if pid == 'flag':
+            return None
+        if isinstance(pid, tuple) and pid[0] == 'shared':
+            return self.shared[pid[1]]
+        return {}
+
+
+class MCTSAgent(Agent):
+    """Bot par recherche arborescente Monte-Carlo (UCT) sur les tours du joueur.
+
+    Chaque décision part de la position courante : une simulation copie la partie (copie pickle
+    d'un instantané pris une fois par décision, sans journal), descend l'arbre en choisissant un
+    tour candidat par UCT, fait jouer les autres joueurs jusqu'au tour suivant, puis termine par
+    une partie rapide de rollout_turns tours jouée par des bots gloutons et notée par la part du
+    joueur dans chaque condition de victoire.
+
+    Les positions sont rangées dans une table de transposition indexée par empreinte Zobrist et
+    gardée d'un tour à l'autre : l'arbre exploré pendant un tour sert au suivant. Les positions
+    qui n'ont pas servi depuis deux décisions sont oubliées quand la table dépasse max_nodes.
+    Une décision s'arrête après iterations simulations ou time_budget secondes.
+
+    Les simulations partent de copies pickle et non de l'ActionHistory : une simulation joue des
+    tours entiers (Game.economy_step, Player.next_turn, tours des autres joueurs), que l'historique
+    d'actions ne sait pas annuler puisqu'il ne couvre que les actions de Game.perform_action. La
+    copie ne transporte ni les flux aléatoires (réensemencés de toute façon) ni les caches de
+    chemins (partagés, voir SearchPickler) et coûte environ 0,4 ms ; une simulation complète en
+    coûte environ 1,1, surtout passée dans les tours des bots gloutons.
+    """
+
+    def __init__(self, iterations=200, time_budget=0.5, depth=2, rollout_turns=2, exploration=1.4, seed=None,
+                 max_nodes=100000):
+        self.iterations = iterations  # Nombre maximal de simulations par décision
+        self.time_budget = time_budget  # Durée maximale d'une décision, en secondes (None : pas de limite)
+        self.depth = depth  # Nombre de tours du joueur descendus dans l'arbre
+        self.rollout_turns = rollout_turns  # Nombre de tours joués par les bots gloutons en fin de simulation
+        self.exploration = exploration  # Constante d'exploration d'UCT
+        self.max_nodes = max_nodes  # Taille de la table au-delà de laquelle les vieilles positions sont oubliées
+        self.rng = random.Random(seed)  # Graines des simulations
+        self.hasher = ZobristHasher(self.rng.getrandbits(64))
+        self.table = {}  # Table de transposition : empreinte -> SearchNode
+        self.generation = 0  # Numéro de la décision en cours
+        self.rollout_agent = GreedyAgent()  # Politique des tours simulés
+        self.candidate_agents = (GreedyAgent(), GreedyAgent(min_win_probability=0.4))
+
+    def decide(self, game, player):
+        self.generation += 1
+        if len(self.table) > self.max_nodes:
+            self.table = {key: node for key, node in self.table.items() if node.generation >= self.generation - 2}
+
+        snapshot = io.BytesIO()
+        pickler = SearchPickler(snapshot, game)
+        pickler.dump(game)
+        snapshot = snapshot.getvalue(), pickler.shared
+        root = self.get_node(self.hasher.hash(game, player), game, player)
+        if len(root.plans) > 1:
+            deadline = time.perf_counter() + self.time_budget if self.time_budget is not None else None
+            for _ in range(self.iterations):
+                self.simulate(root, snapshot, player.player_id)
+                if deadline is not None and time.perf_counter() >= deadline:
+                    break
+        best_edge = max(range(len(root.plans)), key=lambda edge: root.edge_visits[edge])
+        return self.decode_plan(game, root.plans[best_edge])
+
+    def get_node(self, key, game, player):
+        """Retourne la position de la table (créée avec ses tours candidats si nouvelle)."""
+        node = self.table.get(key)
+        if node is None:
+            node = self.table[key] = SearchNode(self.candidate_plans(game, player), self.generation)
+        node.generation = self.generation
+        return node
+
+    def candidate_plans(self, game, player):
+        """Retourne les tours candidats (encodés) : variantes gloutonnes et tour sans action."""
+        plans = []
+        for agent in self.candidate_agents:
+            plan = agent.decide(game, player)
+            plans.append(plan)
+            plans.append([action for action in plan if action[0] not in ('attack', 'declare_war')])
+            plans.append([action for action in plan if action[0] != 'build_infrastructure'])
+        plans.append([])
+        encoded = []
+        for plan in plans:
+            plan = tuple(
+                (action, *(game.encode_argument(argument) for argument in arguments))
+                for action, *arguments in plan
+            )
+            if plan not in encoded:
+                encoded.append(plan)
+        return encoded
+
+    def decode_plan(self, game, plan):
+        """Retrouve les objets d'un tour encodé dans une partie (les actions impossibles sont ignorées)."""
+        actions = []
+        for action, *arguments in plan:
+            arguments = [game.decode_argument(argument) for argument in arguments]
+            if None not in arguments:
+                actions.append((action, *arguments))
+        return actions
+
+    def simulate(self, root, snapshot, player_id):
+        """Fait une simulation depuis la racine et remonte sa récompense dans les positions traversées."""
+        data, shared = snapshot
+        game = SearchUnpickler(io.BytesIO(data), shared, self.rng.getrandbits(64)).load()
+        # Les copies n'affichent rien, même quand la partie d'origine est affichée
+        game.headless = True
+        for other in game.players:
+            other.headless = True
+        for other in game.players:
+            game.agents[other.player_id] = self.rollout_agent
+        player = game.decode_argument(('player', player_id))
+
+        path = []
+        node = root
+        finished = False
+        for _ in range(self.depth):
+            edge = node.select(self.exploration)
+            path.append((node, edge))
+            self.play(game, player, self.decode_plan(game, node.plans[edge]))
+            finished = self.advance(game, player)
+            if finished:
+                break
+            key = self.hasher.hash(game, player)
+            expanded = key not in self.table
+            node = self.get_node(key, game, player)
+            if expanded:
+                break
+
+        for _ in range(self.rollout_turns):
+            if finished:
+                break
+            self.play(game, player, self.rollout_agent.decide(game, player))
+            finished = self.advance(game, player)
+
+        reward = self.evaluate(game, player)
+        for node, edge in path:
+            node.update(edge, reward)
+
+    def play(self, game, player, actions):
+        """Fait jouer un tour au joueur dans une copie de recherche."""
+        for action, *arguments in actions:
+            game.perform_action(player, action, *arguments)
+
+    def advance(self, game, player):
+        """Fait jouer les autres joueurs jusqu'au prochain tour de player ; retourne True si la partie est finie."""
+        index = game.players.index(player)
+        if game.check_victory_conditions(player):
+            return True
+        for other in game.players[index + 1:]:
+            game.process_player_turn(other)
+            if game.check_victory_conditions(other):
+                return True
+        game.current_turn += 1
+        if game.current_turn > game.max_turns:
+            return True
+        if game.batch_economy:
+            game.economy_step()
+        for other in game.players[:index]:
+            game.process_player_turn(other)
+            if game.check_victory_conditions(other):
+                return True
+        player.next_turn(update_economy=not game.batch_economy)
+        return False
+
+    def evaluate(self, game, player):
+        """Note une position entre 0 et 1 : part moyenne du joueur dans chaque condition de victoire."""
+        measures = (
+            lambda p: p.soldier_count,
+            lambda p: len(p.fleets),
+            lambda p: p.total_territory_size,
+            lambda p: max(0, p.resources['money']),
+        )
+        reward = 0.0
+        for measure in measures:
+            total = sum(measure(other) for other in game.players)
+            reward += measure(player) / total if total else 1 / len(game.players)
+        return reward / len(measures)
@@ -1,5 +1,8 @@
 import random
 
+import numpy as np
+from PIL import Image
+
 
 class Game:
     def __init__(self):
@@ -44,7 +47,47 @@ class Game:
             joueur.setup(random_argent, random_population, random_armée, random_flotte, random_taille_de_territoire)
 
 class Map:
-    pass
+    def __init__(self, chemin_carte="images/map.png", chemin_couleurs_inpeignables="images/couleurs_inpeignables.png"):
+        # Pixels peignables de la carte (ni mer, ni frontières) et territoire de chaque pixel (0 : aucun)
+        carte = np.asarray(Image.open(chemin_carte).convert("RGB"))
+        inpeignables = np.unique(couleurs_en_entiers(np.asarray(Image.open(chemin_couleurs_inpeignables).convert("RGB"))))
+        self.hauteur, self.largeur = carte.shape[:2]
+        self.peignable = np.empty((self.hauteur, self.largeur), dtype=bool)
+        for y in range(0, self.hauteur, 1024):  # Par bandes, pour ne pas recopier toute l'image d'un coup
+            self.peignable[y:y + 1024] = ~np.isin(couleurs_en_entiers(carte[y:y + 1024]), inpeignables)
+        self.territoires = np.zeros((self.hauteur, self.largeur), dtype=np.uint16)
+        self.propriétaires_des_territoires = [None]  # Joueur de chaque numéro de territoire
+        self.tailles_des_territoires = [0]  # Taille en pixels de chaque territoire
+        self.zones_des_territoires = [None]  # Rectangle (x, y, largeur, hauteur) qui contient chaque territoire
+        self.pixels_par_joueur = {}
+        self.zones_modifiées = []  # Rectangles (x, y, largeur, hauteur) repeints, à reporter à l'affichage
+
+    def territoire(self, x, y):
+        return int(self.territoires[y, x])
+
+    def propriétaire(self, x, y):
+        return self.propriétaires_des_territoires[self.territoires[y, x]]
+
+    def peindre(self, joueur, x, y, pixels=None):
+        # Remplit depuis (x, y) les pixels libres et peignables les plus proches, anneau par anneau ;
+        # chaque zone peinte devient un nouveau territoire du joueur, dont le numéro est retourné
+        if pixels is None:
+            pixels = joueur.territoire_à_peindre_restant
+        if pixels <= 0 or not self.peignable[y, x] or self.territoires[y, x]:
+            return 0
+        numéro = len(self.propriétaires_des_territoires)
+        if numéro > np.iinfo(self.territoires.dtype).max:
+            # Plus de numéro libre : le territoire repasserait à 0 (aucun) et pourrait être repeint
+            return 0
+        total, zone = remplissage(self.peignable, self.territoires, y * self.largeur + x, pixels, numéro)
+        self.propriétaires_des_territoires.append(joueur)
+        self.tailles_des_territoires.append(total)
+        self.zones_des_territoires.append(zone)
+        self.zones_modifiées.append(zone)
+        self.pixels_par_joueur[joueur] = self.pixels_par_joueur.get(joueur, 0) + total
+        joueur.territoires.append(numéro)
+        joueur.territoire_à_peindre_restant = max(0, joueur.territoire_à_peindre_restant - total)
+        return numéro
 
 
 class Joueur:
@@ -69,3 +112,37 @@ class Joueur:
         self.territoire_à_peindre_restant = taille_de_territoire
 
 
+def couleurs_en_entiers(pixels):
+    # Une couleur RGB par entier, pour comparer des pixels à une liste de couleurs d'un coup
+    pixels = pixels.astype(np.uint32)
+    return (pixels[..., 0] << 16) | (pixels[..., 1] << 8) | pixels[..., 2]
+
+
+def remplissage(peignable, territoires, départ, pixels, numéro):
+    # Parcours en largeur vectorisé (4-connexité) sur les indices à plat des pixels : chaque étape
+    # peint tout l'anneau suivant, sauf le dernier qui n'est pris qu'en partie pour finir pile à pixels.
+    # Le coût ne dépend que du nombre de pixels peints, pas de la taille de la carte ni de la forme de la zone.
+    # Retourne le nombre de pixels peints et le rectangle (x, y, largeur, hauteur) qui les contient.
+    largeur = peignable.shape[1]
+    peignable = peignable.ravel()
+    territoires = territoires.ravel()
+    front = np.array([départ])
+    territoires[départ] = numéro
+    total = 1
+    premier, dernier = départ, départ
+    gauche, droite = départ % largeur, départ % largeur
+    while total < pixels and front.size:
+        colonnes = front % largeur
+        voisins = np.concatenate((front - largeur, front + largeur,
+                                  front[colonnes > 0] - 1, front[colonnes < largeur - 1] + 1))
+        voisins = np.unique(voisins[(voisins >= 0) & (voisins < peignable.size)])
+        voisins = voisins[peignable[voisins] & (territoires[voisins] == 0)][:pixels - total]
+        territoires[voisins] = numéro
+        total += voisins.size
+        front = voisins
+        if front.size:
+            premier, dernier = min(premier, front[0]), max(dernier, front[-1])
+            colonnes = front % largeur
+            gauche, droite = min(gauche, colonnes.min()), max(droite, colonnes.max())
+    haut, bas = premier // largeur, dernier // largeur
+    return total, (int(gauche), int(haut), int(droite - gauche + 1), int(bas - haut + 1))
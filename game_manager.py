@@ -1,6 +1,7 @@
 import pygame
 from classes import *
 from utils import *
+from rendu import Rendu, CalquesCarte
 import random
 # basic pygame window
 pygame.init()
@@ -36,10 +37,37 @@ game.ajouter_joueur_depuis_classe(joueur1)
 game.ajouter_joueur_depuis_classe(joueur2)
 
 game.initialisation()
+
+
+def dessiner_menu(surface, zone):
+    #fill screen in light brown
+    surface.fill((181, 101, 29), zone)
+
+
+def commencer_partie():
+    # Charge la carte, peint le territoire de départ de chaque joueur et y place son armée
+    global carte, state
+    carte = Map()
+    for joueur in game.joueurs:
+        while joueur.territoire_à_peindre_restant > 0 and not joueur.territoires:
+            carte.peindre(joueur, random.randrange(carte.largeur), random.randrange(carte.hauteur))
+    calques.mettre_à_jour_territoires(carte)
+    for joueur in game.joueurs:
+        if joueur.armée:
+            for numéro in joueur.territoires:
+                calques.placer_icône(("armée", joueur.nom, numéro), armée, calques.zones_des_territoires[numéro].center)
+    state = "map_visualizing"
+
+
+rendu = Rendu(screen)
+carte = None  # Carte peignable (classes.Map), chargée seulement quand la partie commence
+calques = CalquesCarte(world_map, (819, 819), salir=rendu.salir)
+scènes = {"menu": dessiner_menu, "map_visualizing": calques.dessiner}
 running = True
 state = "menu"
 while running:
     for event in pygame.event.get():
+        rendu.gérer_événement(event)
         if event.type == pygame.QUIT:
             running = False
 
@@ -47,17 +75,26 @@ while running:
             if event.key == pygame.K_ESCAPE:
                 running = False
 
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            if event.button == 1:
-                pass
-    if state == "menu":
-        #fill screen in light brown
-        screen.fill((181, 101, 29))
-    if state == "map_visualizing":
-        screen.blit(world_map, (0, 0))
+        if event.type == pygame.MOUSEMOTION and state == "map_visualizing":
+            calques.surligner("survol", calques.territoire_à(event.pos))
 
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if event.button == 1 and state == "menu":
+                commencer_partie()
+            elif event.button == 1 and state == "map_visualizing":
+                # Une unité sous le curseur passe avant le territoire sur lequel elle se trouve
+                unité = calques.icône_à(event.pos)
+                calques.sélectionner_icône(unité)
+                territoire = calques.territoire_à(event.pos) if unité is None else 0
+                calques.surligner("sélection", territoire, (255, 255, 255, 140))
+    if rendu.scène is not scènes[state]:
+        rendu.changer_de_scène(scènes[state])
+    # Les territoires repeints depuis la dernière image sont reportés sur leur calque
+    if carte is not None:
+        calques.mettre_à_jour_territoires(carte)
 
-    pygame.display.flip()
+    # Seules les zones salies depuis la dernière image sont redessinées et envoyées à l'écran
+    rendu.rendre()
 
 pygame.quit()
 quit()
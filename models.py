@@ -1,22 +1,166 @@
+import hashlib
+import json
+import logging
+import pickle
 import random
+import struct
+import zlib
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from operator import attrgetter
+import numpy as np
 from PIL import Image
 
+class IndexedSet:
+    """Liste d'objets indexée par identifiant : ajout, retrait, appartenance et recherche en O(1).
+
+    Le retrait remplace l'objet retiré par le dernier de la liste, l'ordre n'est donc pas conservé.
+    L'accès par position reste possible (random.choice, etc.).
+    """
+    def __init__(self, key):
+        self.key = key  # Fonction retournant l'identifiant d'un objet
+        self.items = []  # Objets
+        self.positions = {}  # Identifiant -> position dans items
+
+    def append(self, item):
+        self.positions[self.key(item)] = len(self.items)
+        self.items.append(item)
+
+    def remove(self, item):
+        position = self.positions.pop(self.key(item))
+        last = self.items.pop()
+        if last is not item:
+            self.items[position] = last
+            self.positions[self.key(last)] = position
+
+    def get(self, item_id, default=None):
+        """Retourne l'objet ayant cet identifiant."""
+        position = self.positions.get(item_id)
+        return self.items[position] if position is not None else default
+
+    def __contains__(self, item):
+        position = self.positions.get(self.key(item))
+        return position is not None and self.items[position] is item
+
+    def __getitem__(self, position):
+        return self.items[position]
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+class EmptyIndexedSet(IndexedSet):
+    """IndexedSet vide partagé par toutes les cases qui n'ont encore ni armée ni flotte.
+
+    Une case ne crée son propre IndexedSet qu'au premier ajout (voir Territory.add_army) : la
+    plupart des territoires et des zones maritimes n'accueillent jamais d'unité.
+    """
+    def __init__(self):
+        super().__init__(id)
+
+    def append(self, item):
+        raise TypeError("NO_UNITS est partagé : le remplacer par un IndexedSet avant d'ajouter.")
+
+    def __reduce__(self):
+        return 'NO_UNITS'  # Reste le même objet une fois copié ou chargé
+
+
+NO_UNITS = EmptyIndexedSet()
+
+
+class RandomStreams:
+    """Flux aléatoires indépendants d'une partie, tous dérivés d'une même graine.
+
+    Chaque usage a son propre flux (carte, mise en place, combats, actions, décisions de l'IA) :
+    rejouer les actions d'une partie sans refaire les décisions de l'IA redonne donc exactement
+    les mêmes combats et les mêmes constructions.
+    """
+    NAMES = ('map', 'setup', 'combat', 'actions', 'ai')
+
+    def __init__(self, seed=None):
+        # Sans graine, elle est tirée du module random (reproductible avec random.seed)
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        for name in self.NAMES:
+            setattr(self, name, random.Random(f"{self.seed}:{name}"))
+
+
+def position_key(identifier):
+    """Retourne une clé de 64 bits stable (d'un processus à l'autre) pour un identifiant d'objet du jeu."""
+    return int.from_bytes(hashlib.blake2b(identifier.encode(), digest_size=8).digest(), 'little')
+
+
 class Army:
     def __init__(self, army_id, owner, location, strength=1):
         self.army_id = army_id  # Identifiant unique de l'armée
         self.owner = owner  # Propriétaire de l'armée (Player)
         self.location = location  # Territoire où l'armée est stationnée
-        self.strength = strength  # Nombre de soldats dans l'armée
-        self.upkeep_cost = 10  # Coût d'entretien de l'armée (-10฿ par tour)
+        self._strength = strength  # Nombre de soldats dans l'armée (voir strength)
+        self.upkeep_cost = 10  # Coût d'entretien par soldat (-10฿ par tour)
         self.is_moving = False  # Indique si l'armée est en mouvement
         self.has_moved_this_turn = False  # Indique si l'armée a déjà été déplacée ce tour
         self.is_in_combat = False  # Indique si l'armée est engagée dans un combat
         self.penalty = 0  # Pénalité après une défaite (-1 pour chaque défaite)
 
-    def move_to(self, destination):
-        """Déplace l'armée vers un territoire adjacent ou à l'intérieur du même pays."""
+    @property
+    def strength(self):
+        return self._strength
+
+    @strength.setter
+    def strength(self, value):
+        # Les totaux du joueur (soldats, entretien) suivent les changements d'effectif
+        delta = value - self._strength
+        self._strength = value
+        if self in self.owner.armies:
+            self.owner.soldier_count += delta
+            self.owner.unit_upkeep += self.upkeep_cost * delta
+            self.owner.notify_leaderboard('largest_army')
+
+    def split(self, soldiers):
+        """Détache soldiers soldats dans une nouvelle armée sur le même territoire et la retourne."""
+        detachment = Army(
+            army_id=self.owner.next_army_id(),
+            owner=self.owner,
+            location=self.location,
+            strength=soldiers
+        )
+        detachment.upkeep_cost = self.upkeep_cost
+        detachment.penalty = self.penalty
+        detachment.has_moved_this_turn = self.has_moved_this_turn
+        if detachment.has_moved_this_turn:
+            self.owner.mark_touched(detachment)
+        self.strength -= soldiers
+        self.owner.add_army(detachment)
+        self.location.add_army(detachment)
+        return detachment
+
+    def merge(self, other):
+        """Fait rejoindre cette armée par une autre armée du même joueur, qui disparaît."""
+        # Une armée fusionnée garde la pire situation des deux piles
+        if other.has_moved_this_turn and not self.has_moved_this_turn:
+            self.has_moved_this_turn = True
+            self.owner.mark_touched(self)
+        self.penalty = min(self.penalty, other.penalty)
+        other.location.remove_army(other)
+        self.owner.remove_army(other)
+        self.strength += other.strength
+
+    def move_to(self, destination, soldiers=None):
+        """Déplace l'armée (ou seulement soldiers soldats) vers un territoire adjacent ou à l'intérieur du même pays."""
         if self.has_moved_this_turn:
-            print("Cette armée a déjà été déplacée ce tour.")
+            self.owner.log('move', "Cette armée a déjà été déplacée ce tour.", level=logging.DEBUG, unit=self.army_id, outcome='refused')
+            return False
+
+        if soldiers is not None and 0 < soldiers < self.strength:
+            # Seule une partie de la pile se déplace
+            detachment = self.split(soldiers)
+            if detachment.move_to(destination):
+                return True
+            self.merge(detachment)
             return False
 
         # Vérifier si le déplacement est possible
@@ -28,15 +172,34 @@ class Army:
             destination.add_army(self)
             self.location = destination
             self.has_moved_this_turn = True
+            self.owner.mark_touched(self)
+            self.owner.log('move', f"L'armée {self.army_id} s'est déplacée vers {destination.name}.", unit=self.army_id,
+                           outcome=destination.territory_id, display=False)
             return True
         else:
-            print("Déplacement impossible vers ce territoire.")
+            self.owner.log('move', "Déplacement impossible vers ce territoire.", level=logging.DEBUG, unit=self.army_id, outcome='refused')
+            return False
+
+    def path_to(self, destination):
+        """Retourne le plus court chemin terrestre vers la destination (None si inaccessible)."""
+        if self.location.paths is None:
+            return None
+        return self.location.paths.path(self.location, destination)
+
+    def move_towards(self, destination):
+        """Avance d'une étape sur le plus court chemin vers la destination."""
+        path = self.path_to(destination)
+        if not path or len(path) < 2:
+            self.owner.log('move', "Aucun chemin vers ce territoire.", level=logging.DEBUG, unit=self.army_id, outcome='refused')
             return False
+        return self.move_to(path[1])
 
     def engage_in_combat(self, enemy_army):
         """Engage un combat avec une armée ennemie."""
         self.is_in_combat = True
         enemy_army.is_in_combat = True
+        self.owner.mark_touched(self)
+        enemy_army.owner.mark_touched(enemy_army)
 
         # Calcul des forces
         attacker_strength = self.calculate_combat_strength(is_attacking=True)
@@ -48,7 +211,7 @@ class Army:
         defender_ratio = defender_strength / total_strength
 
         # Simulation de la roue
-        outcome = random.choices(
+        outcome = self.owner.rng.combat.choices(
             ['attacker_win', 'defender_win'],
             weights=[attacker_ratio, defender_ratio],
             k=1
@@ -82,20 +245,29 @@ class Army:
             # Navires proches
             nearby_ships = self.location.count_nearby_ships(self.owner)
             strength += nearby_ships
-        # Appliquer les pénalités éventuelles
+        # Appliquer les pénalités éventuelles (une armée garde toujours une force d'au moins 1)
         strength += self.penalty
-        return strength
+        return max(1, strength)
+
+    def battle_odds(self, enemy_army):
+        """Retourne les chances de victoire et les pertes attendues si l'armée attaquait enemy_army."""
+        return battle_odds(
+            self.calculate_combat_strength(is_attacking=True),
+            enemy_army.calculate_combat_strength(is_attacking=False),
+            self.strength,
+            enemy_army.strength
+        )
 
     def apply_battle_outcome(self, result):
         """Applique le résultat d'une bataille à l'armée."""
         if result == 'victory':
-            print(f"L'armée {self.army_id} a remporté la bataille.")
+            self.owner.log('battle', f"L'armée {self.army_id} a remporté la bataille.", unit=self.army_id, outcome='victory')
             # Réinitialiser la pénalité
             self.penalty = 0
             # Réinitialiser la pénalité de production du joueur si applicable
             self.owner.reset_production_penalty()
         elif result == 'defeat':
-            print(f"L'armée {self.army_id} a perdu la bataille.")
+            self.owner.log('battle', f"L'armée {self.army_id} a perdu la bataille.", unit=self.army_id, outcome='defeat')
             # Perte de 1/3 des soldats
             losses = max(1, self.strength // 3)
             self.strength -= losses
@@ -118,17 +290,19 @@ class Army:
                 self.location.remove_army(self)
                 territory.add_army(self)
                 self.location = territory
-                print(f"L'armée {self.army_id} a reculé vers {territory.name}.")
+                self.owner.log('retreat', f"L'armée {self.army_id} a reculé vers {territory.name}.", unit=self.army_id,
+                               outcome=territory.territory_id)
                 return
         # Si aucun territoire ami, l'armée est détruite
-        print(f"L'armée {self.army_id} n'a pas pu reculer et est détruite.")
+        self.owner.log('retreat', f"L'armée {self.army_id} n'a pas pu reculer et est détruite.", unit=self.army_id,
+                       outcome='destroyed')
         self.disband()
 
     def disband(self):
         """Dissout l'armée."""
         self.location.remove_army(self)
-        self.owner.armies.remove(self)
-        print(f"L'armée {self.army_id} a été dissoute.")
+        self.owner.remove_army(self)
+        self.owner.log('disband', f"L'armée {self.army_id} a été dissoute.", unit=self.army_id)
 
     def reset_for_new_turn(self):
         """Réinitialise les états pour le nouveau tour."""
@@ -137,26 +311,128 @@ class Army:
         self.is_moving = False
 
 
+def resolve_battles(engagements):
+    """Résout d'un coup une liste de combats terrestres (armée attaquante, armée défenseuse).
+
+    Les forces sont calculées comme dans Army.calculate_combat_strength, mais avec NumPy et en ne
+    calculant qu'une fois les bonus de chaque territoire. Toutes les roues sont tirées en un seul
+    appel, puis les pertes et les replis sont appliqués dans l'ordre des combats.
+
+    Les combats du lot sont simultanés : forces et bonus sont ceux d'avant le lot, même pour une
+    armée affaiblie ou repoussée par un combat précédent du lot. Seule une armée détruite par un
+    combat précédent ne combat plus. Retourne deux tableaux de booléens : la victoire de
+    l'attaquant (False pour un combat qui n'a pas eu lieu) et les combats qui ont eu lieu.
+    """
+    if not engagements:
+        return np.zeros(0, dtype=bool), np.zeros(0, dtype=bool)
+    attackers, defenders = zip(*engagements)
+
+    # Bonus défensifs par territoire (infrastructure, relief, taille) et par territoire/joueur (navires)
+    location_bonus = {}
+    naval_support = {}
+    defender_bonus = np.empty(len(defenders))
+    for i, defender in enumerate(defenders):
+        location = defender.location
+        if location not in location_bonus:
+            location_bonus[location] = (
+                location.has_special_infrastructure()
+                + 2 * location.is_mountainous()
+                + max(1, location.size // 5000)
+            )
+        key = (location, defender.owner)
+        if key not in naval_support:
+            naval_support[key] = location.count_nearby_ships(defender.owner)
+        defender_bonus[i] = location_bonus[location] + naval_support[key]
+
+    attacker_strength = np.maximum(1, (
+        np.fromiter((army.strength for army in attackers), float, len(attackers)) * 3
+        + np.fromiter((army.penalty for army in attackers), float, len(attackers))
+    ))
+    defender_strength = np.maximum(1, (
+        np.fromiter((army.strength for army in defenders), float, len(defenders))
+        + np.fromiter((army.penalty for army in defenders), float, len(defenders))
+        + defender_bonus
+    ))
+    # Les forces sont au moins 1 (comme Army.calculate_combat_strength) : une pile vide ou pénalisée
+    # garde une chance de victoire dans [0, 1] et le tirage ne divise jamais par zéro
+
+    # Simulation de toutes les roues (la graine est tirée du flux de combat pour rester reproductible)
+    rng = np.random.default_rng(attackers[0].owner.rng.combat.getrandbits(64))
+    attacker_wins = rng.random(len(attackers)) * (attacker_strength + defender_strength) < attacker_strength
+
+    # Application des résultats
+    resolved = np.ones(len(attackers), dtype=bool)
+    for i, (attacker, defender, attacker_won) in enumerate(zip(attackers, defenders, attacker_wins)):
+        if attacker.location is None or defender.location is None:
+            resolved[i] = False
+            attacker_wins[i] = False
+            continue
+        attacker.is_in_combat = True
+        defender.is_in_combat = True
+        attacker.owner.mark_touched(attacker)
+        defender.owner.mark_touched(defender)
+        if attacker_won:
+            defender.apply_battle_outcome('defeat')
+            attacker.apply_battle_outcome('victory')
+        else:
+            attacker.apply_battle_outcome('defeat')
+            defender.apply_battle_outcome('victory')
+    return attacker_wins, resolved
+
+
+@lru_cache(maxsize=4096)
+def battle_odds(attacker_strength, defender_strength, attacker_units, defender_units):
+    """Calcule les chances exactes d'une bataille (une seule roue) et les pertes attendues.
+
+    Le perdant perd 1/3 de ses unités (au moins 1), comme dans apply_battle_outcome. Les résultats
+    sont mémorisés : les mêmes simulations répétées par l'interface ou les bots sont gratuites.
+    Retourne (probabilité de victoire de l'attaquant, pertes attendues de l'attaquant,
+    pertes attendues du défenseur).
+    """
+    # Une force est toujours d'au moins 1 : pas de division par zéro ni de probabilité hors de [0, 1]
+    attacker_strength = max(1, attacker_strength)
+    defender_strength = max(1, defender_strength)
+    win_probability = attacker_strength / (attacker_strength + defender_strength)
+    attacker_losses = (1 - win_probability) * min(attacker_units, max(1, attacker_units // 3))
+    defender_losses = win_probability * min(defender_units, max(1, defender_units // 3))
+    return win_probability, attacker_losses, defender_losses
+
+
 class Fleet:
     def __init__(self, fleet_id, owner, location, ships=1):
         self.fleet_id = fleet_id  # Identifiant unique de la flotte
         self.owner = owner  # Propriétaire de la flotte (Player)
         self.location = location  # Zone maritime où la flotte est stationnée
-        self.ships = ships  # Nombre de navires dans la flotte
+        self._ships = ships  # Nombre de navires dans la flotte (voir ships)
         self.upkeep_cost = 20  # Coût d'entretien de la flotte (-20฿ par tour)
         self.is_moving = False  # Indique si la flotte est en mouvement
         self.has_moved_this_turn = False  # Indique si la flotte a déjà été déplacée ce tour
         self.armies_transported = []  # Armées transportées par la flotte
         self.is_in_combat = False  # Indique si la flotte est engagée dans un combat naval
 
+    @property
+    def ships(self):
+        return self._ships
+
+    @ships.setter
+    def ships(self, value):
+        # Les totaux de navires de la zone maritime suivent les pertes et les renforts
+        delta = value - self._ships
+        self._ships = value
+        if isinstance(self.location, SeaZone) and self in self.location.fleets:
+            self.location.add_ships(self.owner, delta)
+
     def move_to(self, destination):
         """Déplace la flotte vers une autre zone maritime."""
         if self.has_moved_this_turn:
-            print("Cette flotte a déjà été déplacée ce tour.")
+            self.owner.log('move', "Cette flotte a déjà été déplacée ce tour.", level=logging.DEBUG, unit=self.fleet_id, outcome='refused')
             return False
 
         # Vérifier le nombre de cases à parcourir
         distance = self.location.calculate_distance(destination)
+        if distance is None:
+            self.owner.log('move', "Aucune route maritime vers cette zone.", level=logging.DEBUG, unit=self.fleet_id, outcome='refused')
+            return False
         turns_needed = (distance // 2) or 1  # Chaque 2 cases prend 1 tour
 
         self.owner.turns_to_wait += turns_needed - 1  # Ajuster le temps d'attente si nécessaire
@@ -164,12 +440,17 @@ class Fleet:
         destination.add_fleet(self)
         self.location = destination
         self.has_moved_this_turn = True
+        self.owner.mark_touched(self)
+        self.owner.log('move', f"La flotte {self.fleet_id} s'est déplacée vers {destination.name}.", unit=self.fleet_id,
+                       outcome=destination.sea_zone_id, display=False)
         return True
 
     def engage_in_naval_combat(self, enemy_fleet):
         """Engage un combat naval avec une flotte ennemie."""
         self.is_in_combat = True
         enemy_fleet.is_in_combat = True
+        self.owner.mark_touched(self)
+        enemy_fleet.owner.mark_touched(enemy_fleet)
 
         # Calcul des forces
         attacker_strength = self.calculate_combat_strength()
@@ -181,7 +462,7 @@ class Fleet:
         defender_ratio = defender_strength / total_strength
 
         # Simulation de la roue
-        outcome = random.choices(
+        outcome = self.owner.rng.combat.choices(
             ['attacker_win', 'defender_win'],
             weights=[attacker_ratio, defender_ratio],
             k=1
@@ -207,14 +488,25 @@ class Fleet:
         strength += total_soldiers * 1
         return strength
 
+    def battle_odds(self, enemy_fleet):
+        """Retourne les chances de victoire et les pertes attendues si la flotte attaquait enemy_fleet."""
+        return battle_odds(
+            self.calculate_combat_strength(),
+            enemy_fleet.calculate_combat_strength(),
+            self.ships,
+            enemy_fleet.ships
+        )
+
     def apply_battle_outcome(self, result):
         """Applique le résultat d'une bataille navale à la flotte."""
         if result == 'victory':
-            print(f"La flotte {self.fleet_id} a remporté la bataille navale.")
+            self.owner.log('naval_battle', f"La flotte {self.fleet_id} a remporté la bataille navale.", unit=self.fleet_id,
+                           outcome='victory')
             # Bonus pour la prochaine bataille terrestre
             self.owner.naval_victories += 1
         elif result == 'defeat':
-            print(f"La flotte {self.fleet_id} a perdu la bataille navale.")
+            self.owner.log('naval_battle', f"La flotte {self.fleet_id} a perdu la bataille navale.", unit=self.fleet_id,
+                           outcome='defeat')
             # Perte de navires
             losses = max(1, self.ships // 3)
             self.ships -= losses
@@ -227,13 +519,19 @@ class Fleet:
 
     def transport_armies(self, armies):
         """Charge des armées à bord de la flotte."""
-        if len(armies) + len(self.armies_transported) <= self.ships * 2:
+        # Chaque navire transporte 2 soldats (une armée empilée compte pour tous ses soldats)
+        soldiers = sum(army.strength for army in armies) + sum(army.strength for army in self.armies_transported)
+        if soldiers <= self.ships * 2:
             self.armies_transported.extend(armies)
             for army in armies:
+                # L'armée quitte son territoire mais reste au joueur : soldier_count ne change pas
+                if isinstance(army.location, Territory):
+                    army.location.remove_army(army)
                 army.location = self.location
-            print(f"Armées transportées par la flotte {self.fleet_id}.")
+            self.owner.log('transport', f"Armées transportées par la flotte {self.fleet_id}.", unit=self.fleet_id)
         else:
-            print("Pas assez de capacité pour transporter toutes les armées.")
+            self.owner.log('transport', "Pas assez de capacité pour transporter toutes les armées.", level=logging.DEBUG,
+                           unit=self.fleet_id, outcome='refused')
 
     def unload_armies(self, destination):
         """Décharge les armées transportées sur un territoire."""
@@ -241,7 +539,7 @@ class Fleet:
             destination.add_army(army)
             army.location = destination
         self.armies_transported.clear()
-        print(f"Armées déchargées sur {destination.name}.")
+        self.owner.log('unload', f"Armées déchargées sur {destination.name}.", unit=self.fleet_id, outcome=destination.territory_id)
 
     def retreat(self):
         """Fait reculer la flotte vers une zone maritime amie."""
@@ -251,16 +549,20 @@ class Fleet:
                 self.location.remove_fleet(self)
                 sea_zone.add_fleet(self)
                 self.location = sea_zone
-                print(f"La flotte {self.fleet_id} a reculé vers {sea_zone.name}.")
+                self.owner.log('retreat', f"La flotte {self.fleet_id} a reculé vers {sea_zone.name}.", unit=self.fleet_id,
+                               outcome=sea_zone.sea_zone_id)
                 return
         # Si aucune zone amie, la flotte est détruite
-        print(f"La flotte {self.fleet_id} n'a pas pu reculer et est détruite.")
+        self.owner.log('retreat', f"La flotte {self.fleet_id} n'a pas pu reculer et est détruite.", unit=self.fleet_id,
+                       outcome='destroyed')
         self.disband()
 
     def disband(self):
         """Dissout la flotte."""
-        self.owner.fleets.remove(self)
-        print(f"La flotte {self.fleet_id} a été dissoute.")
+        if self.location is not None:
+            self.location.remove_fleet(self)
+        self.owner.remove_fleet(self)
+        self.owner.log('disband', f"La flotte {self.fleet_id} a été dissoute.", unit=self.fleet_id)
 
     def reset_for_new_turn(self):
         """Réinitialise les états pour le nouveau tour."""
@@ -270,14 +572,23 @@ class Fleet:
 
 
 class Player:
-    def __init__(self, player_id, name, color, flag_image_path):
+    def __init__(self, player_id, name, color, flag_image_path, headless=False, world=None, event_log=None,
+                 rng=None):
         self.player_id = player_id  # Identifiant unique du joueur
         self.name = name  # Nom du joueur
         self.color = color  # Couleur associée au joueur
-        self.flag = Image.open(flag_image_path)
+        self.headless = headless  # Mode sans affichage (simulations en masse)
+        self.world = world  # Colonnes des territoires de la partie (WorldState)
+        self.event_log = event_log  # Journal des événements de la partie (EventLog)
+        self.rng = rng if rng is not None else RandomStreams()  # Flux aléatoires de la partie
+        self.army_counter = 0  # Nombre d'armées créées (pour des identifiants uniques)
+        self.fleet_counter = 0  # Nombre de flottes créées (pour des identifiants uniques)
+        # Le drapeau n'est décodé que si la partie est affichée
+        self.flag_image_path = flag_image_path  # Chemin de l'image du drapeau
+        self.flag = None if headless else Image.open(flag_image_path)
         self.territories = []  # Liste des territoires contrôlés par le joueur
-        self.armies = []  # Liste des armées appartenant au joueur
-        self.fleets = []  # Liste des flottes appartenant au joueur
+        self.armies = IndexedSet(attrgetter('army_id'))  # Armées appartenant au joueur
+        self.fleets = IndexedSet(attrgetter('fleet_id'))  # Flottes appartenant au joueur
         self.allies = []  # Liste des alliés du joueur
         self.war_declarations = []  # Liste des pays en guerre
         self.puppet_states = []  # États fantoches contrôlés
@@ -287,15 +598,21 @@ class Player:
         self.naval_victories = 0  # Nombre de victoires navales
         self.production_penalty = False  # Indique si la production est ralentie
         self.current_turn = 1  # Compteur de tours
+        self.total_territory_size = 0  # Taille totale du territoire, tenue à jour à chaque changement
+        self.territory_key = 0  # XOR des position_key des territoires, tenu à jour à chaque changement
+        self.unit_upkeep = 0  # Entretien total des armées et flottes, tenu à jour à chaque changement
+        self.soldier_count = 0  # Nombre total de soldats, tenu à jour à chaque changement
+        self.touched_units = set()  # Unités déplacées ou ayant combattu depuis le début du tour
+        self.leaderboard = None  # Classement de la partie à prévenir des changements (Leaderboard)
 
         # Ressources initiales
         self.resources = {
-            'money': random.choice([1000, 5000, 10000, 25000, 50000]),
-            'population': random.choice([20, 50, 100, 500]),
+            'money': self.rng.setup.choice([1000, 5000, 10000, 25000, 50000]),
+            'population': self.rng.setup.choice([20, 50, 100, 500]),
         }
 
         # Générer le territoire initial
-        self.initial_territory_size = random.randint(1000, 25000)
+        self.initial_territory_size = self.rng.setup.randint(1000, 25000)
         self.generate_initial_territory()
 
         # Générer les armées et flottes initiales
@@ -305,6 +622,16 @@ class Player:
         self.military_spending_level = 1  # Niveau de dépense militaire (1, 2 ou 4)
         self.soldier_production = 0  # Nombre de soldats produits par tour
 
+    def log(self, event_type, message, level=logging.INFO, unit=None, outcome=None, display=True):
+        """Enregistre un événement du joueur dans le journal et affiche son message, sauf en mode headless.
+
+        display=False n'écrit l'événement que dans le journal (déplacements réussis, qui n'étaient pas affichés).
+        """
+        if display and not self.headless:
+            print(message)
+        if self.event_log is not None:
+            self.event_log.record(event_type, self.player_id, message, level, unit, outcome)
+
     def generate_initial_territory(self):
         """Génère le territoire initial du joueur."""
         capital = Territory(
@@ -316,37 +643,40 @@ class Player:
             terrain_type='plains',
             is_capital=True,
             is_port=False,
-            relief_level=random.randint(1, 7),
-            depth_level=random.randint(1, 7)
+            relief_level=self.rng.setup.randint(1, 7),
+            depth_level=self.rng.setup.randint(1, 7),
+            world=self.world
         )
-        self.territories.append(capital)
+        self.add_territory(capital)
 
     def initialize_military_units(self):
         """Initialise les armées et flottes du joueur."""
-        initial_armies = random.randint(1, 5)
-        for _ in range(initial_armies):
-            army = Army(
-                army_id=f"{self.player_id}_army_{len(self.armies)}",
-                owner=self,
-                location=self.territories[0],
-                strength=1
-            )
-            self.armies.append(army)
-            self.territories[0].add_army(army)
+        initial_armies = self.rng.setup.randint(1, 5)
+        self.reinforce(self.territories[0], initial_armies)
 
         # Vérifier si le joueur a un accès maritime
         if self.has_coastal_territory():
-            initial_fleets = random.randint(1, 5)
+            initial_fleets = self.rng.setup.randint(1, 5)
             for _ in range(initial_fleets):
                 fleet = Fleet(
-                    fleet_id=f"{self.player_id}_fleet_{len(self.fleets)}",
+                    fleet_id=self.next_fleet_id(),
                     owner=self,
                     location=self.get_coastal_territory(),
                     ships=1
                 )
-                self.fleets.append(fleet)
+                self.add_fleet(fleet)
                 self.get_coastal_territory().add_fleet(fleet)
 
+    def next_army_id(self):
+        """Retourne un identifiant d'armée jamais utilisé par ce joueur."""
+        self.army_counter += 1
+        return f"{self.player_id}_army_{self.army_counter - 1}"
+
+    def next_fleet_id(self):
+        """Retourne un identifiant de flotte jamais utilisé par ce joueur."""
+        self.fleet_counter += 1
+        return f"{self.player_id}_fleet_{self.fleet_counter - 1}"
+
     def has_coastal_territory(self):
         """Vérifie si le joueur possède un territoire côtier."""
         for territory in self.territories:
@@ -365,7 +695,7 @@ class Player:
         """Met à jour les ressources du joueur en appliquant les revenus et les dépenses."""
         income = self.calculate_income()
         expenses = self.calculate_expenses()
-        self.resources['money'] += income - expenses
+        self.add_money(income - expenses)
 
     def calculate_income(self):
         """Calcule les revenus totaux du joueur pour le tour."""
@@ -382,7 +712,7 @@ class Player:
         expenses = 0
         # Coûts d'entretien des armées
         for army in self.armies:
-            expenses += army.upkeep_cost
+            expenses += army.upkeep_cost * army.strength
         # Coûts d'entretien des flottes
         for fleet in self.fleets:
             expenses += fleet.upkeep_cost
@@ -396,24 +726,46 @@ class Player:
         """Produit des soldats en fonction du niveau de dépense militaire."""
         production_rates = {1: 1, 2: 2, 4: 4}
         self.soldier_production = production_rates.get(self.military_spending_level, 1)
-        for _ in range(self.soldier_production):
-            army = Army(
-                army_id=f"{self.player_id}_army_{len(self.armies)}",
-                owner=self,
-                location=self.get_capital(),
-                strength=1
-            )
-            self.armies.append(army)
-            self.get_capital().add_army(army)
+        self.reinforce(self.get_capital(), self.soldier_production)
+
+    def reinforce(self, territory, soldiers):
+        """Ajoute des soldats à la pile du joueur sur un territoire (créée si besoin) et la retourne."""
+        stack = territory.find_stack(self)
+        if stack is not None:
+            stack.strength += soldiers
+            return stack
+        army = Army(
+            army_id=self.next_army_id(),
+            owner=self,
+            location=territory,
+            strength=soldiers
+        )
+        self.add_army(army)
+        territory.add_army(army)
+        return army
+
+    def consolidate_armies(self):
+        """Fusionne les armées du joueur stationnées sur un même territoire en une seule pile."""
+        stacks = {}
+        for army in list(self.armies):
+            # Les armées à bord d'une flotte (dans une zone maritime) ne sont pas fusionnées
+            if not isinstance(army.location, Territory) or army not in army.location.armies:
+                continue
+            if army.location in stacks:
+                stacks[army.location].merge(army)
+            else:
+                stacks[army.location] = army
 
     def change_military_spending(self, new_level):
         """Change le niveau de dépense militaire."""
         if self.action_points['military'] > 0 and new_level in [1, 2, 4]:
             self.military_spending_level = new_level
             self.action_points['military'] -= 1
-            print(f"{self.name} a changé son niveau de dépense militaire à {new_level}.")
+            self.log('military_spending', f"{self.name} a changé son niveau de dépense militaire à {new_level}.",
+                     outcome=new_level)
         else:
-            print("Impossible de changer le niveau de dépense militaire.")
+            self.log('military_spending', "Impossible de changer le niveau de dépense militaire.", level=logging.DEBUG,
+                     outcome='refused')
 
     def get_capital(self):
         """Retourne le territoire qui est la capitale."""
@@ -434,16 +786,21 @@ class Player:
         """Recharge les points d'action pour le nouveau tour."""
         self.action_points = {'military': 2, 'diplomatic': 2, 'bonus': 1}
 
-    def next_turn(self):
-        """Prépare le joueur pour le prochain tour."""
+    def next_turn(self, update_economy=True):
+        """Prépare le joueur pour le prochain tour.
+
+        update_economy=False laisse la mise à jour des ressources à Game.economy_step.
+        """
         self.current_turn += 1
         self.update_action_points()
-        self.update_resources()
+        if update_economy:
+            self.update_resources()
         self.produce_soldiers()
-        for army in self.armies:
-            army.reset_for_new_turn()
-        for fleet in self.fleets:
-            fleet.reset_for_new_turn()
+        # Seules les unités qui ont agi ont des états à réinitialiser
+        for unit in self.touched_units:
+            unit.reset_for_new_turn()
+        self.touched_units.clear()
+        self.consolidate_armies()
         # Réinitialiser la pénalité de production si nécessaire
         if self.production_penalty and not self.has_recent_defeats():
             self.reset_production_penalty()
@@ -459,22 +816,24 @@ class Player:
         if self.action_points['diplomatic'] >= 2:
             self.war_declarations.append(enemy_player)
             self.action_points['diplomatic'] -= 2
-            print(f"{self.name} a déclaré la guerre à {enemy_player.name}.")
+            self.log('declare_war', f"{self.name} a déclaré la guerre à {enemy_player.name}.", outcome=enemy_player.player_id)
         else:
-            print("Pas assez de points d'action diplomatiques pour déclarer la guerre.")
+            self.log('declare_war', "Pas assez de points d'action diplomatiques pour déclarer la guerre.",
+                     level=logging.DEBUG, outcome='refused')
 
     def manage_alliances(self, other_player, action):
         """Gère les alliances avec d'autres joueurs."""
         if action == 'ally' and self.action_points['diplomatic'] > 0:
             self.allies.append(other_player)
             self.action_points['diplomatic'] -= 1
-            print(f"{self.name} s'est allié avec {other_player.name}.")
+            self.log('alliance', f"{self.name} s'est allié avec {other_player.name}.", outcome=other_player.player_id)
         elif action == 'break' and other_player in self.allies:
             self.allies.remove(other_player)
             self.action_points['diplomatic'] -= 1
-            print(f"{self.name} a rompu son alliance avec {other_player.name}.")
+            self.log('alliance_break', f"{self.name} a rompu son alliance avec {other_player.name}.",
+                     outcome=other_player.player_id)
         else:
-            print("Action impossible.")
+            self.log('alliance', "Action impossible.", level=logging.DEBUG, outcome='refused')
 
     def change_ideology(self, new_ideology):
         """Change l'idéologie du joueur."""
@@ -482,9 +841,10 @@ class Player:
             self.ideology = new_ideology
             self.apply_ideology_effects()
             self.action_points['diplomatic'] -= 1
-            print(f"{self.name} a adopté l'idéologie {new_ideology}.")
+            self.log('ideology', f"{self.name} a adopté l'idéologie {new_ideology}.", outcome=new_ideology)
         else:
-            print("Pas assez de points d'action diplomatiques pour changer d'idéologie.")
+            self.log('ideology', "Pas assez de points d'action diplomatiques pour changer d'idéologie.",
+                     level=logging.DEBUG, outcome='refused')
 
     def apply_ideology_effects(self):
         """Applique les effets de l'idéologie choisie."""
@@ -515,12 +875,13 @@ class Player:
             army.upkeep_cost = 10
         for fleet in self.fleets:
             fleet.upkeep_cost = 20
+        self.unit_upkeep = 10 * self.soldier_count + 20 * len(self.fleets)
 
     def apply_socialism_effects(self):
         """Applique les effets spécifiques du socialisme."""
         # Diminue la production d'argent par -10%
         # Note : Cela pourrait être appliqué dans calculate_income avec un check sur l'idéologie
-        self.resources['money'] *= 0.9
+        self.add_money(-self.resources['money'] * 0.1)
         # Augmente la production des soldats par +1
         self.soldier_production += 1
         # Diminue le coût d’entretien de chaque armée/navire
@@ -528,11 +889,12 @@ class Player:
             army.upkeep_cost = 5
         for fleet in self.fleets:
             fleet.upkeep_cost = 10
+        self.unit_upkeep = 5 * self.soldier_count + 10 * len(self.fleets)
 
     def build_infrastructure(self, territory, infrastructure_type):
         """Construit une nouvelle infrastructure sur un territoire spécifié."""
         if self.action_points['bonus'] > 0 and territory.can_build_infrastructure(infrastructure_type):
-            cost = random.randint(5000, 7500)
+            cost = self.rng.actions.randint(5000, 7500)
             if self.resources['money'] >= cost:
                 infrastructure = Infrastructure(
                     infrastructure_id=f"{territory.territory_id}_{infrastructure_type}_{len(territory.infrastructures)}",
@@ -542,27 +904,52 @@ class Player:
                     location=territory
                 )
                 territory.add_infrastructure(infrastructure)
-                self.resources['money'] -= cost
+                self.add_money(-cost)
                 self.action_points['bonus'] -= 1
-                print(f"{self.name} a construit {infrastructure_type} sur {territory.name}.")
+                self.log('build', f"{self.name} a construit {infrastructure_type} sur {territory.name}.",
+                         unit=infrastructure.infrastructure_id, outcome=infrastructure_type)
             else:
-                print("Pas assez d'argent pour construire cette infrastructure.")
+                self.log('build', "Pas assez d'argent pour construire cette infrastructure.", level=logging.DEBUG,
+                         outcome='refused')
         else:
-            print("Impossible de construire cette infrastructure.")
+            self.log('build', "Impossible de construire cette infrastructure.", level=logging.DEBUG, outcome='refused')
 
-    def move_unit(self, unit, destination):
-        """Déplace une unité vers une destination spécifiée."""
-        if isinstance(unit, Army) or isinstance(unit, Fleet):
+    def move_unit(self, unit, destination, soldiers=None):
+        """Déplace une unité vers une destination spécifiée (seulement soldiers soldats si précisé)."""
+        if isinstance(unit, Fleet) and soldiers:
+            self.log('move', "Une flotte ne peut pas être divisée.", level=logging.DEBUG, outcome='refused')
+        elif isinstance(unit, Army) or isinstance(unit, Fleet):
             if self.action_points['military'] > 0:
-                moved = unit.move_to(destination)
+                moved = unit.move_to(destination, soldiers) if soldiers else unit.move_to(destination)
                 if moved:
                     self.action_points['military'] -= 1
                 else:
-                    print("L'unité n'a pas pu se déplacer.")
+                    self.log('move', "L'unité n'a pas pu se déplacer.", level=logging.DEBUG, outcome='refused')
             else:
-                print("Pas assez de points d'action militaires pour déplacer l'unité.")
+                self.log('move', "Pas assez de points d'action militaires pour déplacer l'unité.", level=logging.DEBUG,
+                         outcome='refused')
+        else:
+            self.log('move', "Type d'unité invalide.", level=logging.DEBUG, outcome='refused')
+
+    def attack(self, army, enemy_army):
+        """Attaque avec une armée une armée ennemie sur le même territoire ou un territoire adjacent."""
+        if self.action_points['military'] <= 0:
+            self.log('attack', "Pas assez de points d'action militaires pour attaquer.", level=logging.DEBUG,
+                     outcome='refused')
+        elif army.owner is not self or army.location is None or army.has_moved_this_turn:
+            self.log('attack', "Cette armée ne peut pas attaquer.", level=logging.DEBUG, unit=army.army_id,
+                     outcome='refused')
+        elif enemy_army.owner not in self.war_declarations:
+            self.log('attack', "Il faut déclarer la guerre avant d'attaquer.", level=logging.DEBUG, unit=army.army_id,
+                     outcome='refused')
+        elif enemy_army.location is not army.location and enemy_army.location not in army.location.adjacent_territories:
+            self.log('attack', "L'armée ennemie est hors de portée.", level=logging.DEBUG, unit=army.army_id,
+                     outcome='refused')
         else:
-            print("Type d'unité invalide.")
+            self.action_points['military'] -= 1
+            army.has_moved_this_turn = True
+            self.mark_touched(army)
+            army.engage_in_combat(enemy_army)
 
     def colonize(self, sea_zone):
         """Colonise un nouveau territoire via une flotte."""
@@ -573,7 +960,7 @@ class Player:
                 moved = fleet.move_to(sea_zone)
                 if moved:
                     # Lancer la roue pour déterminer la taille du territoire
-                    territory_size = random.randint(5000, 50000)
+                    territory_size = self.rng.actions.randint(5000, 50000)
                     new_territory = Territory(
                         territory_id=f"{self.player_id}_colony_{len(self.territories)}",
                         name=f"Colonie de {self.name}",
@@ -582,9 +969,10 @@ class Player:
                         resources={'wealth': 0, 'population': 0},
                         terrain_type='plains',
                         is_capital=False,
-                        is_port=True
+                        is_port=True,
+                        world=self.world
                     )
-                    self.territories.append(new_territory)
+                    self.add_territory(new_territory)
                     # Ajouter un port, une usine simple et 2 soldats
                     port = Infrastructure(
                         infrastructure_id=f"{new_territory.territory_id}_port",
@@ -594,23 +982,19 @@ class Player:
                         location=new_territory
                     )
                     new_territory.add_infrastructure(port)
-                    for _ in range(2):
-                        army = Army(
-                            army_id=f"{self.player_id}_army_{len(self.armies)}",
-                            owner=self,
-                            location=new_territory,
-                            strength=1
-                        )
-                        self.armies.append(army)
-                        new_territory.add_army(army)
+                    self.reinforce(new_territory, 2)
                     self.action_points['bonus'] -= 1
-                    print(f"{self.name} a colonisé un nouveau territoire : {new_territory.name}.")
+                    self.log('colonize', f"{self.name} a colonisé un nouveau territoire : {new_territory.name}.",
+                             unit=fleet.fleet_id, outcome=new_territory.territory_id)
                 else:
-                    print("La flotte n'a pas pu se déplacer pour coloniser.")
+                    self.log('colonize', "La flotte n'a pas pu se déplacer pour coloniser.", level=logging.DEBUG,
+                             unit=fleet.fleet_id, outcome='refused')
             else:
-                print("Aucune flotte disponible pour la colonisation.")
+                self.log('colonize', "Aucune flotte disponible pour la colonisation.", level=logging.DEBUG,
+                         outcome='refused')
         else:
-            print("Pas assez de points d'action bonus pour coloniser.")
+            self.log('colonize', "Pas assez de points d'action bonus pour coloniser.", level=logging.DEBUG,
+                     outcome='refused')
 
     def select_available_fleet(self):
         """Sélectionne une flotte disponible pour la colonisation."""
@@ -620,44 +1004,390 @@ class Player:
         return None
 
     def get_total_territory_size(self):
-        """Calcule la taille totale du territoire du joueur."""
-        return sum(territory.size for territory in self.territories)
+        """Retourne la taille totale du territoire du joueur."""
+        return self.total_territory_size
+
+    def mark_touched(self, unit):
+        """Retient qu'une unité a été déplacée ou a combattu, pour la réinitialiser au prochain tour."""
+        self.touched_units.add(unit)
+
+    def notify_leaderboard(self, condition):
+        """Signale au classement qu'une valeur liée à une condition de victoire a changé."""
+        if self.leaderboard is not None:
+            self.leaderboard.update(self, condition)
+
+    def add_army(self, army):
+        """Ajoute une armée au joueur."""
+        self.armies.append(army)
+        self.soldier_count += army.strength
+        self.unit_upkeep += army.upkeep_cost * army.strength
+        self.notify_leaderboard('largest_army')
+
+    def remove_army(self, army):
+        """Retire une armée du joueur."""
+        self.armies.remove(army)
+        self.soldier_count -= army.strength
+        self.unit_upkeep -= army.upkeep_cost * army.strength
+        self.notify_leaderboard('largest_army')
+
+    def add_fleet(self, fleet):
+        """Ajoute une flotte au joueur."""
+        self.fleets.append(fleet)
+        self.unit_upkeep += fleet.upkeep_cost
+        self.notify_leaderboard('largest_navy')
+
+    def remove_fleet(self, fleet):
+        """Retire une flotte du joueur."""
+        self.fleets.remove(fleet)
+        self.unit_upkeep -= fleet.upkeep_cost
+        self.notify_leaderboard('largest_navy')
+
+    def add_territory(self, territory):
+        """Ajoute un territoire au joueur."""
+        self.territories.append(territory)
+        self.total_territory_size += territory.size
+        self.territory_key ^= position_key(territory.territory_id)
+        self.notify_leaderboard('largest_territory')
+
+    def remove_territory(self, territory):
+        """Retire un territoire au joueur."""
+        self.territories.remove(territory)
+        self.total_territory_size -= territory.size
+        self.territory_key ^= position_key(territory.territory_id)
+        self.notify_leaderboard('largest_territory')
+
+    def add_money(self, amount):
+        """Ajoute (ou retire si négatif) de l'argent au joueur."""
+        self.resources['money'] += amount
+        self.notify_leaderboard('richest')
 
 # Les autres classes (Territory, Infrastructure, SeaZone, Map, Game) doivent être également revues de la même manière.
 # Voici les classes mises à jour pour éviter les problèmes de méthodes ou attributs manquants.
 
+class WorldState:
+    """Colonnes NumPy des valeurs scalaires de tous les territoires et infrastructures d'une partie.
+
+    Chaque territoire (et chaque infrastructure) n'est qu'une vue sur une ligne de ces colonnes
+    (voir Territory et Infrastructure), ce qui permet de calculer l'économie et la propriété de toute
+    la carte en une opération vectorisée.
+    """
+    detached = False  # Voir DetachedWorldState
+    COLUMNS = {
+        'sizes': np.int64,  # Taille en pixels
+        'owners': np.int32,  # Indice du propriétaire dans players (-1 si aucun)
+        'wealth': np.int64,  # Richesse générée
+        'population': np.int64,  # Population
+        'relief_levels': np.int8,  # Niveau de relief
+        'depth_levels': np.int8,  # Niveau de profondeur
+        'terrains': np.int8  # Indice du type de terrain dans terrain_types
+    }
+    INFRASTRUCTURE_COLUMNS = {
+        'infrastructure_territories': np.int32,  # Indice du territoire (-1 si pas encore placée)
+        'infrastructure_builders': np.int32,  # Indice du joueur qui l'a construite
+        'infrastructure_bonuses': np.int64,  # Bonus de production
+        'infrastructure_levels': np.int64,  # Niveau
+        'infrastructure_upkeep': np.int64,  # Coût d'entretien
+        'infrastructure_active': np.bool_,  # Statut
+        'infrastructure_alternating': np.bool_  # Ne produit qu'un tour sur deux (pétrole, charbon)
+    }
+
+    def __init__(self, capacity=64):
+        self.count = 0  # Nombre de territoires enregistrés
+        for column, dtype in self.COLUMNS.items():
+            setattr(self, column, np.zeros(capacity, dtype=dtype))
+        self.infrastructure_count = 0  # Nombre d'infrastructures enregistrées
+        for column, dtype in self.INFRASTRUCTURE_COLUMNS.items():
+            setattr(self, column, np.zeros(capacity, dtype=dtype))
+        self.players = []  # Propriétaires possibles, par indice
+        self.player_indices = {}  # Joueur -> indice dans players
+        self.terrain_types = ['plains', 'mountain']  # Types de terrain, par indice
+        self.free_territories = IndexedSet(attrgetter('territory_id'))  # Territoires sans propriétaire
+
+    def add_territory(self, size, owner, wealth, population, terrain_type, relief_level, depth_level):
+        """Ajoute une ligne pour un nouveau territoire et retourne son indice."""
+        index = self.new_row()
+        self.sizes[index] = size
+        self.owners[index] = self.player_index(owner)
+        self.wealth[index] = wealth
+        self.population[index] = population
+        self.terrains[index] = self.terrain_index(terrain_type)
+        self.relief_levels[index] = relief_level
+        self.depth_levels[index] = depth_level
+        return index
+
+    def add_infrastructure(self, builder, alternating):
+        """Ajoute une ligne pour une nouvelle infrastructure et retourne son indice."""
+        index = self.new_infrastructure_row()
+        self.infrastructure_territories[index] = -1
+        self.infrastructure_builders[index] = self.player_index(builder)
+        self.infrastructure_alternating[index] = alternating
+        return index
+
+    def new_row(self):
+        """Réserve une ligne de territoire et retourne son indice."""
+        if self.count == len(self.sizes):
+            self.grow(self.COLUMNS, 2 * self.count)
+        self.count += 1
+        return self.count - 1
+
+    def new_infrastructure_row(self):
+        """Réserve une ligne d'infrastructure et retourne son indice."""
+        if self.infrastructure_count == len(self.infrastructure_territories):
+            self.grow(self.INFRASTRUCTURE_COLUMNS, 2 * self.infrastructure_count)
+        self.infrastructure_count += 1
+        return self.infrastructure_count - 1
+
+    def grow(self, columns, capacity):
+        """Agrandit un groupe de colonnes."""
+        for column in columns:
+            setattr(self, column, np.resize(getattr(self, column), capacity))
+
+    def player_index(self, player):
+        """Retourne l'indice d'un joueur dans la colonne owners (-1 pour aucun)."""
+        if player is None:
+            return -1
+        if player not in self.player_indices:
+            self.player_indices[player] = len(self.players)
+            self.players.append(player)
+        return self.player_indices[player]
+
+    def terrain_index(self, terrain_type):
+        """Retourne l'indice d'un type de terrain dans la colonne terrains."""
+        if terrain_type not in self.terrain_types:
+            self.terrain_types.append(terrain_type)
+        return self.terrain_types.index(terrain_type)
+
+    def owned_by(self, player):
+        """Retourne le masque des territoires appartenant au joueur."""
+        return self.owners[:self.count] == self.player_index(player)
+
+    def totals_by_owner(self, column):
+        """Somme une colonne par propriétaire (tableau indexé comme players)."""
+        owners = self.owners[:self.count]
+        owned = owners >= 0
+        return np.bincount(owners[owned], weights=getattr(self, column)[:self.count][owned],
+                           minlength=len(self.players))
+
+    def economy_by_owner(self, turns):
+        """Calcule la production brute et l'entretien des infrastructures par propriétaire.
+
+        turns donne le numéro du tour de chaque joueur (indexé comme players) : les infrastructures
+        à production alternée ne produisent que si le tour de leur constructeur est pair.
+        Retourne (production, entretien), deux tableaux indexés comme players.
+        """
+        count = self.infrastructure_count
+        territories = self.infrastructure_territories[:count]
+        placed = territories >= 0
+        owners = self.owners[territories[placed]]
+        owned = owners >= 0
+        owners = owners[owned]
+
+        producing = (
+            self.infrastructure_active[:count]
+            & (~self.infrastructure_alternating[:count] | (turns[self.infrastructure_builders[:count]] % 2 == 0))
+        )
+        production = np.where(
+            producing, self.infrastructure_bonuses[:count] * self.infrastructure_levels[:count], 0
+        )[placed][owned]
+        upkeep = self.infrastructure_upkeep[:count][placed][owned]
+
+        income = self.totals_by_owner('wealth')
+        income += np.bincount(owners, weights=production, minlength=len(self.players))
+        expenses = np.bincount(owners, weights=upkeep, minlength=len(self.players))
+        return income, expenses
+
+
+class UntrackedTerritories:
+    """Ensemble vide qui ignore les ajouts (territoires libres d'un DetachedWorldState)."""
+    def append(self, item):
+        pass
+
+    def remove(self, item):
+        pass
+
+    def __contains__(self, item):
+        return False
+
+    def __iter__(self):
+        return iter(())
+
+    def __len__(self):
+        return 0
+
+
+class DetachedWorldState(WorldState):
+    """WorldState partagé par les territoires et infrastructures créés hors d'une partie (sans world).
+
+    La ligne d'un objet détruit est libérée puis réutilisée, et un joueur qui n'a plus aucune ligne
+    est oublié : les objets jetables ne s'accumulent pas. Les territoires libres n'y sont pas suivis.
+    """
+    detached = True
+
+    def __init__(self):
+        super().__init__(capacity=1)
+        self.free_territories = UntrackedTerritories()
+        self.free_rows = []  # Lignes de territoires libérées
+        self.free_infrastructure_rows = []  # Lignes d'infrastructures libérées
+
+    def new_row(self):
+        return self.free_rows.pop() if self.free_rows else super().new_row()
+
+    def new_infrastructure_row(self):
+        return self.free_infrastructure_rows.pop() if self.free_infrastructure_rows else super().new_infrastructure_row()
+
+    def player_index(self, player):
+        # Les places des joueurs oubliés sont réutilisées
+        if player is not None and player not in self.player_indices and None in self.players:
+            index = self.players.index(None)
+            self.players[index] = player
+            self.player_indices[player] = index
+        return super().player_index(player)
+
+    def release_territory(self, index):
+        """Libère la ligne d'un territoire détruit."""
+        self.owners[index] = -1
+        self.free_rows.append(index)
+        self.forget_players()
+
+    def release_infrastructure(self, index):
+        """Libère la ligne d'une infrastructure détruite."""
+        self.infrastructure_territories[index] = -1
+        self.infrastructure_builders[index] = -1
+        self.free_infrastructure_rows.append(index)
+        self.forget_players()
+
+    def forget_players(self):
+        """Oublie les joueurs qui ne possèdent plus de territoire ni d'infrastructure ici."""
+        owners = self.owners[:self.count]
+        builders = self.infrastructure_builders[:self.infrastructure_count]
+        for index, player in enumerate(self.players):
+            if player is not None and not (owners == index).any() and not (builders == index).any():
+                self.players[index] = None
+                del self.player_indices[player]
+
+
+SCRATCH_WORLD = DetachedWorldState()
+
+
+class TerritoryResources:
+    """Vue dictionnaire sur la richesse et la population d'un territoire dans le WorldState."""
+    __slots__ = ('world', 'index')
+    KEYS = ('wealth', 'population')  # Clés disponibles, qui sont aussi les noms des colonnes
+
+    def __init__(self, world, index):
+        self.world = world
+        self.index = index
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return int(getattr(self.world, key)[self.index])
+
+    def __setitem__(self, key, value):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        getattr(self.world, key)[self.index] = value
+
+    def get(self, key, default=None):
+        return self[key] if key in self.KEYS else default
+
+
 class Territory:
-    def __init__(self, territory_id, name, size, owner, resources, terrain_type, is_capital=False, is_port=False, relief_level=1, depth_level=1):
+    __slots__ = (
+        'territory_id', 'name', 'world', 'index', 'armies', 'fleets', 'infrastructures', 'is_capital',
+        'is_port', 'is_coastal', 'adjacent_territories', 'adjacent_sea_zones', 'strategic_value', 'paths'
+    )
+
+    def __init__(self, territory_id, name, size, owner, resources, terrain_type, is_capital=False, is_port=False, relief_level=1, depth_level=1, world=None):
         self.territory_id = territory_id  # Identifiant unique du territoire
         self.name = name  # Nom du territoire
-        self.size = size  # Taille en pixels du territoire
-        self.owner = owner  # Propriétaire actuel (Player)
-        self.resources = {
-            'wealth': resources.get('wealth', 0),  # Richesse générée par le territoire
-            'population': resources.get('population', 0)  # Population du territoire
-        }
-        self.armies = []  # Armées stationnées sur le territoire
-        self.fleets = []  # Flottes stationnées dans les eaux adjacentes
-        self.terrain_type = terrain_type  # Type de terrain (plaine, montagne, etc.)
-        self.infrastructures = []  # Liste des infrastructures (usines, ports, etc.)
+        # Taille, propriétaire, ressources, terrain, relief et profondeur sont stockés dans le WorldState
+        self.world = world if world is not None else SCRATCH_WORLD
+        self.index = self.world.add_territory(
+            size=size,  # Taille en pixels du territoire
+            owner=owner,  # Propriétaire actuel (Player)
+            wealth=resources.get('wealth', 0),  # Richesse générée par le territoire
+            population=resources.get('population', 0),  # Population du territoire
+            terrain_type=terrain_type,  # Type de terrain (plaine, montagne, etc.)
+            relief_level=relief_level,  # Niveau de relief (pour les usines à charbon)
+            depth_level=depth_level  # Niveau de profondeur (pour les exploitations pétrolières)
+        )
+        self.armies = NO_UNITS  # Armées stationnées sur le territoire (créé au premier ajout)
+        self.fleets = NO_UNITS  # Flottes stationnées dans les eaux adjacentes (créé au premier ajout)
+        self.infrastructures = ()  # Infrastructures (usines, ports, etc.), liste créée à la première construction
         self.is_capital = is_capital  # Indique si le territoire est la capitale du joueur
         self.is_port = is_port  # Indique si le territoire possède un port
         self.is_coastal = is_port  # Indique si le territoire est côtier
-        self.relief_level = relief_level  # Niveau de relief (pour les usines à charbon)
-        self.depth_level = depth_level  # Niveau de profondeur (pour les exploitations pétrolières)
         self.adjacent_territories = []  # Territoires adjacents
         self.adjacent_sea_zones = []  # Zones maritimes adjacentes
         self.strategic_value = 0  # Valeur stratégique influençant les combats et la production
+        self.paths = None  # Plus courts chemins terrestres de la carte (PathFinder)
+        if owner is None:
+            self.world.free_territories.append(self)
+
+    def __del__(self):
+        # Un territoire détaché rend sa ligne au WorldState partagé
+        world = getattr(self, 'world', None)
+        if world is not None and world.detached:
+            world.release_territory(self.index)
+
+    @property
+    def size(self):
+        return int(self.world.sizes[self.index])
+
+    @property
+    def owner(self):
+        owner_index = self.world.owners[self.index]
+        return self.world.players[owner_index] if owner_index >= 0 else None
+
+    @owner.setter
+    def owner(self, new_owner):
+        self.world.owners[self.index] = self.world.player_index(new_owner)
+
+    @property
+    def resources(self):
+        return TerritoryResources(self.world, self.index)
+
+    @property
+    def terrain_type(self):
+        return self.world.terrain_types[self.world.terrains[self.index]]
+
+    @property
+    def relief_level(self):
+        return int(self.world.relief_levels[self.index])
+
+    @property
+    def depth_level(self):
+        return int(self.world.depth_levels[self.index])
 
     def change_owner(self, new_owner):
         """Change le propriétaire du territoire."""
+        if new_owner is self.owner:
+            return
+        if self.owner is not None:
+            self.owner.remove_territory(self)
+        else:
+            self.world.free_territories.remove(self)
         self.owner = new_owner
+        if new_owner is not None:
+            new_owner.add_territory(self)
+        else:
+            self.world.free_territories.append(self)
 
     def add_army(self, army):
         """Ajoute une armée sur le territoire."""
+        if self.armies is NO_UNITS:
+            self.armies = IndexedSet(attrgetter('army_id'))
         self.armies.append(army)
         army.location = self
 
+    def find_stack(self, owner):
+        """Retourne une armée du joueur stationnée sur le territoire (None s'il n'y en a pas)."""
+        for army in self.armies:
+            if army.owner is owner:
+                return army
+        return None
+
     def remove_army(self, army):
         """Retire une armée du territoire."""
         if army in self.armies:
@@ -666,6 +1396,8 @@ class Territory:
 
     def add_fleet(self, fleet):
         """Ajoute une flotte dans la zone maritime adjacente."""
+        if self.fleets is NO_UNITS:
+            self.fleets = IndexedSet(attrgetter('fleet_id'))
         self.fleets.append(fleet)
         fleet.location = self
 
@@ -677,7 +1409,13 @@ class Territory:
 
     def add_infrastructure(self, infrastructure):
         """Ajoute une infrastructure (usine, port) au territoire."""
+        if not self.infrastructures:
+            self.infrastructures = []
         self.infrastructures.append(infrastructure)
+        for sea_zone in self.adjacent_sea_zones:
+            sea_zone.add_infrastructure_count(infrastructure.infrastructure_type, infrastructure.owner, 1)
+        if infrastructure.world is self.world:
+            self.world.infrastructure_territories[infrastructure.index] = self.index
         if infrastructure.infrastructure_type == 'Port':
             self.is_port = True
             self.is_coastal = True
@@ -717,20 +1455,27 @@ class Territory:
 
     def count_nearby_ships(self, player):
         """Compte le nombre de navires proches appartenant au joueur."""
-        count = 0
-        for sea_zone in self.adjacent_sea_zones:
-            for fleet in sea_zone.fleets:
-                if fleet.owner == player:
-                    count += fleet.ships
-        return count
+        return sum(sea_zone.count_ships(player) for sea_zone in self.adjacent_sea_zones)
 
 class Infrastructure:
+    ALTERNATING_TYPES = ('Oil Exploitation', 'Coal Factory')  # Ne produisent qu'un tour sur deux
+    DEFAULT_VALUES = {  # Type -> (bonus de production, coût d'entretien)
+        'Factory': (15, 5),
+        'Port': (100, 10),
+        'Additional Port': (50, 5),
+        'Oil Exploitation': (150, 20),
+        'Coal Factory': (50, 10)
+    }
+
     def __init__(self, infrastructure_id, name, infrastructure_type, owner, location):
         self.infrastructure_id = infrastructure_id  # Identifiant unique de l'infrastructure
         self.name = name  # Nom de l'infrastructure
         self.infrastructure_type = infrastructure_type  # Type (usine, port, etc.)
         self.owner = owner  # Propriétaire (Player)
         self.location = location  # Territoire
+        # Bonus, entretien, statut et niveau sont stockés dans le WorldState du territoire
+        self.world = location.world if location is not None else SCRATCH_WORLD
+        self.index = self.world.add_infrastructure(owner, infrastructure_type in self.ALTERNATING_TYPES)
         self.production_bonus = 0  # Bonus de production
         self.upkeep_cost = 0  # Coût d'entretien
         self.is_active = True  # Statut de l'infrastructure
@@ -738,28 +1483,53 @@ class Infrastructure:
         self.capacity = 100  # Capacité maximale
         self.set_default_values()
 
+    def __del__(self):
+        # Une infrastructure détachée rend sa ligne au WorldState partagé
+        world = getattr(self, 'world', None)
+        if world is not None and world.detached:
+            world.release_infrastructure(self.index)
+
     def set_default_values(self):
         """Définit les valeurs par défaut en fonction du type d'infrastructure."""
-        if self.infrastructure_type == 'Factory':
-            self.production_bonus = 15
-            self.upkeep_cost = 5
-        elif self.infrastructure_type == 'Port':
-            self.production_bonus = 100
-            self.upkeep_cost = 10
-        elif self.infrastructure_type == 'Additional Port':
-            self.production_bonus = 50
-            self.upkeep_cost = 5
-        elif self.infrastructure_type == 'Oil Exploitation':
-            self.production_bonus = 150
-            self.upkeep_cost = 20
-        elif self.infrastructure_type == 'Coal Factory':
-            self.production_bonus = 50
-            self.upkeep_cost = 10
+        if self.infrastructure_type in self.DEFAULT_VALUES:
+            self.production_bonus, self.upkeep_cost = self.DEFAULT_VALUES[self.infrastructure_type]
+
+    @property
+    def production_bonus(self):
+        return int(self.world.infrastructure_bonuses[self.index])
+
+    @production_bonus.setter
+    def production_bonus(self, value):
+        self.world.infrastructure_bonuses[self.index] = value
+
+    @property
+    def upkeep_cost(self):
+        return int(self.world.infrastructure_upkeep[self.index])
+
+    @upkeep_cost.setter
+    def upkeep_cost(self, value):
+        self.world.infrastructure_upkeep[self.index] = value
+
+    @property
+    def is_active(self):
+        return bool(self.world.infrastructure_active[self.index])
+
+    @is_active.setter
+    def is_active(self, value):
+        self.world.infrastructure_active[self.index] = value
+
+    @property
+    def level(self):
+        return int(self.world.infrastructure_levels[self.index])
+
+    @level.setter
+    def level(self, value):
+        self.world.infrastructure_levels[self.index] = value
 
     def calculate_production(self):
         """Calcule la production générée."""
         if self.is_active:
-            if self.infrastructure_type in ['Oil Exploitation', 'Coal Factory']:
+            if self.infrastructure_type in self.ALTERNATING_TYPES:
                 if self.owner.current_turn % 2 == 0:
                     return self.production_bonus * self.level
                 else:
@@ -768,6 +1538,15 @@ class Infrastructure:
                 return self.production_bonus * self.level
         return 0
 
+    def change_owner(self, new_owner):
+        """Change le propriétaire de l'infrastructure."""
+        if self in self.location.infrastructures:
+            for sea_zone in self.location.adjacent_sea_zones:
+                sea_zone.add_infrastructure_count(self.infrastructure_type, self.owner, -1)
+                sea_zone.add_infrastructure_count(self.infrastructure_type, new_owner, 1)
+        self.owner = new_owner
+        self.world.infrastructure_builders[self.index] = self.world.player_index(new_owner)
+
     def can_support(self, unit_type):
         """Vérifie si l'infrastructure peut soutenir une unité."""
         if self.infrastructure_type == 'Port' and unit_type == 'Fleet':
@@ -782,47 +1561,175 @@ class SeaZone:
         self.name = name  # Nom de la zone maritime
         self.adjacent_sea_zones = []  # Zones maritimes adjacentes
         self.adjacent_territories = []  # Territoires adjacents
-        self.fleets = []  # Flottes présentes dans la zone
+        self.fleets = NO_UNITS  # Flottes présentes dans la zone (créé au premier ajout)
         self.controlled_by = None  # Joueur contrôlant la zone (si applicable)
+        self.paths = None  # Plus courts chemins maritimes de la carte (PathFinder)
+        self.ship_totals = {}  # Nombre de navires présents dans la zone, par joueur
+        self.infrastructure_counts = {}  # Infrastructures des territoires adjacents, par (type, propriétaire)
 
     def add_fleet(self, fleet):
         """Ajoute une flotte dans la zone maritime."""
+        if self.fleets is NO_UNITS:
+            self.fleets = IndexedSet(attrgetter('fleet_id'))
         self.fleets.append(fleet)
         fleet.location = self
+        self.add_ships(fleet.owner, fleet.ships)
 
     def remove_fleet(self, fleet):
         """Retire une flotte de la zone maritime."""
         if fleet in self.fleets:
             self.fleets.remove(fleet)
             fleet.location = None
+            self.add_ships(fleet.owner, -fleet.ships)
+
+    def add_ships(self, player, ships):
+        """Met à jour le nombre de navires d'un joueur dans la zone."""
+        total = self.ship_totals.get(player, 0) + ships
+        if total > 0:
+            self.ship_totals[player] = total
+        else:
+            self.ship_totals.pop(player, None)
+
+    def count_ships(self, player):
+        """Retourne le nombre de navires d'un joueur dans la zone."""
+        return self.ship_totals.get(player, 0)
 
     def is_controlled_by(self, player):
         """Vérifie si la zone maritime est contrôlée par un joueur."""
         # Simplification : Une zone est contrôlée si un joueur a une flotte dans cette zone
-        for fleet in self.fleets:
-            if fleet.owner == player:
-                return True
-        return False
+        return player in self.ship_totals
 
     def calculate_distance(self, destination):
-        """Calcule la distance en nombre de cases vers une autre zone maritime."""
-        # Implémentation simplifiée pour l'exemple
-        # Vous pouvez utiliser un algorithme de graphe pour calculer la distance réelle
-        return 1  # Supposons une distance de 1 par défaut
+        """Calcule la distance en nombre de cases vers une autre zone maritime (None si inaccessible)."""
+        if self.paths is None:
+            # Zone hors carte : distance d'une case par défaut
+            return 1
+        return self.paths.distance(self, destination)
 
     def count_infrastructure(self, infrastructure_type, owner):
         """Compte le nombre d'infrastructures spécifiques dans les territoires adjacents."""
-        count = 0
-        for territory in self.adjacent_territories:
-            for infra in territory.infrastructures:
-                if infra.infrastructure_type == infrastructure_type and infra.owner == owner:
-                    count += 1
-        return count
+        return self.infrastructure_counts.get((infrastructure_type, owner), 0)
+
+    def add_infrastructure_count(self, infrastructure_type, owner, count):
+        """Met à jour le compteur d'infrastructures adjacentes d'un type et d'un propriétaire."""
+        key = (infrastructure_type, owner)
+        total = self.infrastructure_counts.get(key, 0) + count
+        if total > 0:
+            self.infrastructure_counts[key] = total
+        else:
+            self.infrastructure_counts.pop(key, None)
+
+    def add_adjacent_territory(self, territory):
+        """Relie la zone maritime à un territoire côtier (dans les deux sens)."""
+        self.adjacent_territories.append(territory)
+        territory.adjacent_sea_zones.append(self)
+        for infrastructure in territory.infrastructures:
+            self.add_infrastructure_count(infrastructure.infrastructure_type, infrastructure.owner, 1)
+
+class PathFinder:
+    """Plus courts chemins sur un graphe d'adjacence (territoires ou zones maritimes).
+
+    Chaque passage d'une case à une case voisine coûte 1, un parcours en largeur (BFS) donne donc
+    les plus courts chemins. Sur les petites cartes, toutes les distances sont précalculées ; sur les
+    grandes, chaque recherche depuis une origine est faite à la demande et gardée dans un cache LRU.
+
+    Les parcours sont rangés par identifiant de case (key) et non par objet : ils restent valables
+    dans une copie de la partie, qui peut donc partager le cache de l'originale (voir SearchPickler).
+    """
+    def __init__(self, nodes, get_neighbours, key=None, precompute_limit=500, cache_size=256):
+        self.nodes = nodes  # Cases du graphe
+        self.get_neighbours = get_neighbours  # Fonction retournant les cases voisines d'une case
+        self.key = key  # Fonction retournant l'identifiant d'une case (None : la case elle-même)
+        self.cache_size = cache_size  # Nombre maximal d'origines gardées en cache (grandes cartes)
+        self.searches = OrderedDict()  # Identifiant d'origine -> (distances, prédécesseurs), par identifiants
+        self.nodes_by_key = None  # Identifiant -> case, construit à la première reconstitution de chemin
+        self.precomputed = len(nodes) <= precompute_limit
+        if self.precomputed:
+            for node in nodes:
+                self.searches[self.node_key(node)] = self.search(node)
+
+    def node_key(self, node):
+        """Retourne l'identifiant d'une case dans les parcours."""
+        return node if self.key is None else self.key(node)
+
+    def search(self, source):
+        """Parcours en largeur depuis source : retourne les distances et les prédécesseurs (par identifiants)."""
+        node_key = self.node_key
+        source_key = node_key(source)
+        distances = {source_key: 0}
+        parents = {source_key: None}
+        queue = deque([(source, source_key)])
+        while queue:
+            node, current = queue.popleft()
+            for neighbour in self.get_neighbours(node):
+                neighbour_key = node_key(neighbour)
+                if neighbour_key not in distances:
+                    distances[neighbour_key] = distances[current] + 1
+                    parents[neighbour_key] = current
+                    queue.append((neighbour, neighbour_key))
+        return distances, parents
+
+    def get_search(self, source):
+        """Retourne le parcours depuis source, en le calculant si nécessaire."""
+        source_key = self.node_key(source)
+        if source_key in self.searches:
+            if not self.precomputed:
+                self.searches.move_to_end(source_key)
+            return self.searches[source_key]
+        result = self.search(source)
+        self.searches[source_key] = result
+        # Le cache précalculé peut dépasser cache_size (jusqu'à precompute_limit cases) : jamais d'éviction
+        if not self.precomputed and len(self.searches) > self.cache_size:
+            self.searches.popitem(last=False)
+        return result
+
+    def distance(self, source, destination):
+        """Retourne le nombre de cases entre deux cases (None si inaccessible)."""
+        distances, _ = self.get_search(source)
+        return distances.get(self.node_key(destination))
+
+    def path(self, source, destination):
+        """Retourne la liste des cases de source à destination (None si inaccessible)."""
+        _, parents = self.get_search(source)
+        current = self.node_key(destination)
+        if current not in parents:
+            return None
+        if self.key is None:
+            nodes_by_key = None
+        elif self.nodes_by_key is None:
+            nodes_by_key = self.nodes_by_key = {self.key(node): node for node in self.nodes}
+        else:
+            nodes_by_key = self.nodes_by_key
+        path = [current]
+        while parents[path[-1]] is not None:
+            path.append(parents[path[-1]])
+        path.reverse()
+        return path if nodes_by_key is None else [nodes_by_key[key] for key in path]
+
+    def __getstate__(self):
+        # Les chemins ne sont pas sauvegardés : ils sont recalculés à la demande après un chargement
+        state = self.__dict__.copy()
+        state['searches'] = OrderedDict()
+        state['nodes_by_key'] = None
+        return state
+
+    def invalidate(self):
+        """Vide les chemins connus (à appeler si les adjacences changent)."""
+        self.searches.clear()
+        self.nodes_by_key = None
+        if self.precomputed:
+            for node in self.nodes:
+                self.searches[self.node_key(node)] = self.search(node)
+
 
 class Map:
-    def __init__(self):
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else RandomStreams()  # Flux aléatoires de la partie
         self.territories = []  # Liste des territoires sur la carte
         self.sea_zones = []  # Liste des zones maritimes sur la carte
+        self.world = WorldState()  # Colonnes des valeurs de tous les territoires de la partie
+        self.territory_paths = None  # Plus courts chemins entre territoires (PathFinder)
+        self.sea_paths = None  # Plus courts chemins entre zones maritimes (PathFinder)
 
     def generate_territories(self):
         """Génère les territoires de la carte."""
@@ -832,12 +1739,13 @@ class Map:
             territory = Territory(
                 territory_id=f"territory_{i}",
                 name=f"Territoire {i}",
-                size=random.randint(1000, 25000),
+                size=self.rng.map.randint(1000, 25000),
                 owner=None,
-                resources={'wealth': random.randint(1000, 5000), 'population': random.randint(20, 500)},
-                terrain_type=random.choice(['plains', 'mountain']),
-                relief_level=random.randint(1, 7),
-                depth_level=random.randint(1, 7)
+                resources={'wealth': self.rng.map.randint(1000, 5000), 'population': self.rng.map.randint(20, 500)},
+                terrain_type=self.rng.map.choice(['plains', 'mountain']),
+                relief_level=self.rng.map.randint(1, 7),
+                depth_level=self.rng.map.randint(1, 7),
+                world=self.world
             )
             self.territories.append(territory)
         # Définir les territoires adjacents
@@ -861,6 +1769,9 @@ class Map:
             for idx in adjacent_indices:
                 if 0 <= idx < len(self.territories):
                     territory.adjacent_territories.append(self.territories[idx])
+        self.territory_paths = PathFinder(self.territories, attrgetter('adjacent_territories'), attrgetter('territory_id'))
+        for territory in self.territories:
+            territory.paths = self.territory_paths
 
     def set_adjacent_sea_zones(self):
         """Définit les zones maritimes adjacentes pour chaque zone maritime."""
@@ -869,6 +1780,14 @@ class Map:
             for idx in adjacent_indices:
                 if 0 <= idx < len(self.sea_zones):
                     sea_zone.adjacent_sea_zones.append(self.sea_zones[idx])
+        self.sea_paths = PathFinder(self.sea_zones, attrgetter('adjacent_sea_zones'), attrgetter('sea_zone_id'))
+        for sea_zone in self.sea_zones:
+            sea_zone.paths = self.sea_paths
+
+    @property
+    def free_territories(self):
+        """Territoires sans propriétaire (tenus à jour par Territory.change_owner)."""
+        return self.world.free_territories
 
     def get_adjacent_territories(self, territory):
         """Retourne les territoires adjacents à un territoire donné."""
@@ -878,11 +1797,127 @@ class Map:
         """Retourne les zones maritimes adjacentes à une zone donnée."""
         return sea_zone.adjacent_sea_zones
 
+class EventLog:
+    """Journal structuré des événements d'une partie.
+
+    Chaque événement est un dictionnaire (tour, type, joueur, unité, résultat, niveau, message).
+    Les derniers événements sont gardés dans un tampon circulaire et, si un fichier est donné,
+    écrits par lots au format JSON lines. Les événements sous le niveau choisi sont ignorés
+    (niveaux du module logging).
+    """
+    def __init__(self, path=None, level=logging.INFO, capacity=10000, flush_every=1000):
+        self.path = path  # Fichier JSON lines où écrire les événements (None pour n'en garder qu'en mémoire)
+        self.level = level  # Niveau minimal des événements enregistrés
+        self.events = deque(maxlen=capacity)  # Derniers événements enregistrés
+        self.flush_every = min(flush_every, capacity)  # Taille des lots écrits dans le fichier
+        self.unflushed = 0  # Nombre d'événements pas encore écrits
+        self.turn = 0  # Tour en cours, ajouté à chaque événement
+
+    def record(self, event_type, player_id, message, level=logging.INFO, unit=None, outcome=None):
+        """Enregistre un événement s'il atteint le niveau du journal."""
+        if level < self.level:
+            return
+        self.events.append({
+            'turn': self.turn,
+            'type': event_type,
+            'player': player_id,
+            'unit': unit,
+            'outcome': outcome,
+            'level': level,
+            'message': message
+        })
+        if self.path is not None:
+            self.unflushed += 1
+            if self.unflushed >= self.flush_every:
+                self.flush()
+
+    def flush(self):
+        """Écrit dans le fichier les événements qui ne l'ont pas encore été."""
+        if self.path is None or not self.unflushed:
+            return
+        # Les derniers événements sont pris depuis la fin du tampon sans le copier en entier
+        pending = list(islice(reversed(self.events), self.unflushed))[::-1]
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write(''.join(json.dumps(event, ensure_ascii=False) + '\n' for event in pending))
+        self.unflushed = 0
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def __len__(self):
+        return len(self.events)
+
+
+class Leaderboard:
+    """Suit de façon incrémentale le meneur de chaque condition de victoire.
+
+    Les joueurs préviennent le classement à chaque changement (voir Player.notify_leaderboard) :
+    un joueur qui dépasse le meneur le remplace immédiatement, et la condition n'est recalculée
+    entièrement que si le meneur lui-même recule. Les égalités sont départagées par l'ordre de jeu,
+    comme le ferait max().
+    """
+    CONDITIONS = ('largest_army', 'largest_navy', 'largest_territory', 'richest')
+
+    def __init__(self, players):
+        self.players = players  # Joueurs dans l'ordre de jeu
+        self.order = {player: index for index, player in enumerate(players)}
+        self.leaders = {condition: None for condition in self.CONDITIONS}
+        self.values = {condition: None for condition in self.CONDITIONS}
+        self.stale = set(self.CONDITIONS)  # Conditions à recalculer entièrement
+        for player in players:
+            player.leaderboard = self
+
+    @staticmethod
+    def value(player, condition):
+        """Retourne la valeur d'un joueur pour une condition de victoire."""
+        if condition == 'largest_army':
+            return player.soldier_count
+        if condition == 'largest_navy':
+            return len(player.fleets)
+        if condition == 'largest_territory':
+            return player.total_territory_size
+        return player.resources['money']
+
+    def update(self, player, condition):
+        """Met à jour le meneur d'une condition après un changement chez un joueur."""
+        if condition in self.stale or player not in self.order:
+            return
+        value = self.value(player, condition)
+        leader = self.leaders[condition]
+        if player is leader:
+            if value < self.values[condition]:
+                self.stale.add(condition)
+            else:
+                self.values[condition] = value
+        elif value > self.values[condition] or (
+                value == self.values[condition] and self.order[player] < self.order[leader]):
+            self.leaders[condition] = player
+            self.values[condition] = value
+
+    def leader(self, condition):
+        """Retourne le meneur d'une condition de victoire."""
+        if condition in self.stale:
+            leader = max(self.players, key=lambda p: (self.value(p, condition), -self.order[p]))
+            self.leaders[condition] = leader
+            self.values[condition] = self.value(leader, condition)
+            self.stale.discard(condition)
+        return self.leaders[condition]
+
+
 class Game:
-    def __init__(self):
+    def __init__(self, headless=False, max_turns=10000, log_path=None, log_level=logging.INFO, seed=None):
         self.players = []  # Liste des joueurs participant à la partie
+        self.rng = RandomStreams(seed)  # Flux aléatoires de la partie, tirés de la graine
+        self.action_log = []  # Actions jouées : (tour, joueur, action, arguments encodés)
+        self.turn_digests = []  # Empreinte de l'état à la fin de chaque tour
+        self.replay_actions = None  # Actions à rejouer, par (tour, joueur), en mode replay
+        self.expected_digests = None  # Empreintes attendues en mode replay
+        self.object_index = {}  # (type, identifiant) -> joueur, territoire ou zone maritime (voir decode_argument)
+        self.divergent_turn = None  # Premier tour dont l'empreinte diffère de celle attendue
         self.current_turn = 1  # Numéro du tour actuel
-        self.max_turns = 10000  # Nombre maximal de tours (peut être ajusté)
+        self.max_turns = max_turns  # Nombre maximal de tours (peut être ajusté)
+        self.headless = headless  # Mode sans affichage ni drapeaux (simulations en masse)
+        self.batch_economy = True  # Économie de tous les joueurs calculée en une passe par tour
         self.map = None  # Carte du jeu (instance de la classe Map)
         self.active_player_index = 0  # Indice du joueur dont c'est le tour
         self.is_game_over = False  # Indique si la partie est terminée
@@ -892,133 +1927,649 @@ class Game:
             'largest_territory': None,
             'richest': None
         }
-        self.game_log = []  # Historique des actions et événements du jeu
+        self.game_log = EventLog(path=log_path, level=log_level)  # Historique des actions et événements du jeu
+        self.leaderboard = None  # Classement incrémental des conditions de victoire
+        self.agents = {}  # Agents qui jouent à la place des joueurs, par identifiant de joueur
 
         # Initialiser la carte du jeu
         self.initialize_map()
 
+    def log(self, event_type, message, level=logging.INFO, player=None, outcome=None):
+        """Enregistre un événement de la partie dans le journal et affiche son message, sauf en mode headless."""
+        if not self.headless:
+            print(message)
+        self.game_log.record(event_type, player.player_id if player else None, message, level, None, outcome)
+
     def initialize_map(self):
         """Initialise la carte du jeu avec les territoires et les zones maritimes."""
-        self.map = Map()
+        self.map = Map(rng=self.rng)
         self.map.generate_territories()
         self.map.generate_sea_zones()
 
     def add_player(self, name, color, flag_image_path):
         """Ajoute un joueur à la partie."""
         player_id = f"player_{len(self.players) + 1}"
-        new_player = Player(player_id, name, color, flag_image_path)
+        new_player = Player(player_id, name, color, flag_image_path, headless=self.headless,
+                            world=self.map.world, event_log=self.game_log, rng=self.rng)
         self.players.append(new_player)
-        print(f"Joueur {name} ajouté à la partie.")
+        self.log('player_added', f"Joueur {name} ajouté à la partie.", player=new_player)
+        return new_player
+
+    def set_agent(self, player, agent):
+        """Confie les décisions d'un joueur à un agent (None pour revenir aux actions aléatoires).
+
+        Un agent a une méthode decide(game, player) qui retourne les actions du tour, sous forme de
+        tuples (nom de méthode de Player, arguments...), jouées ensuite par perform_action.
+        """
+        if agent is None:
+            self.agents.pop(player.player_id, None)
+        else:
+            self.agents[player.player_id] = agent
 
     def setup_game(self):
         """Prépare le jeu avant le début de la partie."""
         # Assigner les territoires initiaux aux joueurs
         self.assign_initial_territories()
         # Définir l'ordre de jeu (peut être aléatoire)
-        random.shuffle(self.players)
-        print("Le jeu est prêt à commencer.")
+        self.rng.setup.shuffle(self.players)
+        self.leaderboard = Leaderboard(self.players)
+        self.log('setup', "Le jeu est prêt à commencer.")
 
     def assign_initial_territories(self):
         """Assigne des territoires initiaux à chaque joueur."""
         for player in self.players:
             # Sélectionner un territoire non assigné aléatoirement
-            available_territories = [t for t in self.map.territories if t.owner is None]
+            available_territories = self.map.free_territories
             if available_territories:
-                initial_territory = random.choice(available_territories)
+                initial_territory = self.rng.setup.choice(available_territories)
                 initial_territory.change_owner(player)
-                player.territories.append(initial_territory)
-                print(f"{player.name} a reçu le territoire {initial_territory.name} comme capitale.")
+                self.log('setup', f"{player.name} a reçu le territoire {initial_territory.name} comme capitale.",
+                         player=player)
             else:
-                print("Plus de territoires disponibles pour l'assignation initiale.")
+                self.log('setup', "Plus de territoires disponibles pour l'assignation initiale.", level=logging.WARNING,
+                         player=player)
 
     def start_game(self):
-        """Démarre la partie."""
+        """Démarre la partie et retourne le résultat de la partie (voir end_game)."""
         self.is_game_over = False
-        print("La partie commence !")
+        self.log('game_start', "La partie commence !")
         while not self.is_game_over and self.current_turn <= self.max_turns:
-            print(f"\n--- Tour {self.current_turn} ---")
+            self.game_log.turn = self.current_turn
+            self.log('turn', f"\n--- Tour {self.current_turn} ---")
+            if self.batch_economy:
+                self.economy_step()
             for player in self.players:
                 self.active_player_index = self.players.index(player)
                 self.process_player_turn(player)
                 if self.check_victory_conditions(player):
                     self.is_game_over = True
                     break
+            self.record_turn_digest()
             self.current_turn += 1
-        self.end_game()
+        return self.end_game()
+
+    def replay(self, actions, turn_digests=None):
+        """Rejoue une liste d'actions enregistrées (action_log) à la place des décisions des joueurs.
+
+        La partie doit avoir été créée avec la même graine et les mêmes joueurs que la partie
+        enregistrée. Si turn_digests est donné, divergent_turn indique le premier tour dont l'état
+        diffère de l'enregistrement. Retourne le résultat de la partie (voir end_game).
+        """
+        self.replay_actions = {}
+        for turn, player_id, action, arguments in actions:
+            self.replay_actions.setdefault((turn, player_id), []).append((action, arguments))
+        self.expected_digests = turn_digests
+        self.divergent_turn = None
+        return self.start_game()
+
+    def state_digest(self):
+        """Retourne une empreinte rapide de l'état des joueurs (pour comparer deux parties)."""
+        return zlib.crc32(repr([
+            (player.player_id, player.resources['money'], player.soldier_count, len(player.fleets),
+             player.total_territory_size)
+            for player in self.players
+        ]).encode())
+
+    def record_turn_digest(self):
+        """Enregistre l'empreinte du tour et la compare à celle attendue en mode replay."""
+        digest = self.state_digest()
+        self.turn_digests.append(digest)
+        if self.expected_digests is not None and self.divergent_turn is None:
+            index = len(self.turn_digests) - 1
+            if index >= len(self.expected_digests) or self.expected_digests[index] != digest:
+                self.divergent_turn = self.current_turn
+
+    def perform_action(self, player, action, *arguments):
+        """Fait jouer une action à un joueur (nom d'une méthode de Player) et l'enregistre."""
+        self.action_log.append(
+            (self.current_turn, player.player_id, action, tuple(self.encode_argument(a) for a in arguments))
+        )
+        return getattr(player, action)(*arguments)
+
+    def encode_argument(self, argument):
+        """Remplace un objet du jeu par une référence (type, identifiant) pour le journal d'actions."""
+        if isinstance(argument, Army):
+            return 'army', argument.owner.player_id, argument.army_id
+        if isinstance(argument, Fleet):
+            return 'fleet', argument.owner.player_id, argument.fleet_id
+        if isinstance(argument, Player):
+            return 'player', argument.player_id
+        if isinstance(argument, Territory):
+            return 'territory', argument.territory_id
+        if isinstance(argument, SeaZone):
+            return 'sea_zone', argument.sea_zone_id
+        return argument
+
+    def decode_argument(self, argument):
+        """Retrouve l'objet du jeu désigné par une référence créée par encode_argument (None s'il n'existe pas)."""
+        if not isinstance(argument, tuple):
+            return argument
+        kind = argument[0]
+        if kind == 'army' or kind == 'fleet':
+            owner = self.decode_argument(('player', argument[1]))
+            if owner is None:
+                return None
+            units = owner.armies if kind == 'army' else owner.fleets
+            return units.get(argument[2])
+        if kind in ('player', 'territory', 'sea_zone'):
+            key = kind, argument[1]
+            if key not in self.object_index:
+                # Index reconstruit seulement pour un objet créé depuis (colonisation) ou inconnu
+                self.build_object_index()
+            return self.object_index.get(key)
+        return argument
+
+    def build_object_index(self):
+        """Indexe les joueurs, territoires et zones maritimes par identifiant."""
+        index = {('player', player.player_id): player for player in self.players}
+        for territory in self.map.territories:
+            index['territory', territory.territory_id] = territory
+        for player in self.players:
+            for territory in player.territories:
+                index['territory', territory.territory_id] = territory
+        for sea_zone in self.map.sea_zones:
+            index['sea_zone', sea_zone.sea_zone_id] = sea_zone
+        self.object_index = index
 
     def process_player_turn(self, player):
         """Gère le tour d'un joueur."""
-        print(f"\nC'est le tour de {player.name}.")
-        player.next_turn()
-
-        # Ici, vous pouvez implémenter la logique pour permettre au joueur de prendre des actions
-        # Par exemple, demander à l'utilisateur de choisir ses actions
-        # Pour ce contexte, nous allons simuler des actions aléatoires
+        self.log('player_turn', f"\nC'est le tour de {player.name}.", player=player)
+        player.next_turn(update_economy=not self.batch_economy)
+
+        if self.replay_actions is not None:
+            # Mode replay : on rejoue les actions enregistrées sans aucune décision
+            for action, arguments in self.replay_actions.get((self.current_turn, player.player_id), ()):
+                decoded = [self.decode_argument(a) for a in arguments]
+                if any(value is None and isinstance(a, tuple) for a, value in zip(arguments, decoded)):
+                    # Une unité ou un lieu enregistré n'existe pas ici : la partie a déjà divergé
+                    if self.divergent_turn is None:
+                        self.divergent_turn = self.current_turn
+                    continue
+                self.perform_action(player, action, *decoded)
+            return
+
+        agent = self.agents.get(player.player_id)
+        if agent is not None:
+            for action, *arguments in agent.decide(self, player):
+                self.perform_action(player, action, *arguments)
+            return
+
+        # Sans agent, nous allons simuler des actions aléatoires
         self.simulate_player_actions(player)
 
+    def economy_step(self):
+        """Met à jour en une passe vectorisée les ressources de tous les joueurs pour le tour.
+
+        Équivaut à Player.update_resources pour chaque joueur, calculé pour le tour qui commence
+        (revenus des territoires et des infrastructures, pénalité de production, entretien des unités
+        et des infrastructures).
+        """
+        world = self.map.world
+        for player in self.players:
+            world.player_index(player)
+        turns = np.array([player.current_turn + 1 for player in world.players], dtype=np.int64)
+        income, expenses = world.economy_by_owner(turns)
+
+        indices = [world.player_index(player) for player in self.players]
+        income = income[indices]
+        penalties = np.array([player.production_penalty for player in self.players], dtype=bool)
+        income[penalties] /= 2  # Divise les revenus par 2
+        expenses = expenses[indices] + np.array([player.unit_upkeep for player in self.players])
+
+        # np.bincount retourne des flottants : comme update_resources, le solde reste entier sauf pénalité
+        for player, balance in zip(self.players, (income - expenses).tolist()):
+            player.add_money(balance if player.production_penalty else int(balance))
+
     def simulate_player_actions(self, player):
         """Simule des actions pour le joueur (à remplacer par une interface utilisateur réelle)."""
         # Exemple d'actions aléatoires
         actions = ['move_unit', 'build_infrastructure', 'declare_war', 'change_ideology']
         for _ in range(player.action_points['military']):
-            action = random.choice(actions)
+            action = self.rng.ai.choice(actions)
             if action == 'move_unit':
                 # Sélectionner une unité et une destination aléatoirement
                 if player.armies:
-                    army = random.choice(player.armies)
+                    army = self.rng.ai.choice(player.armies)
                     available_territories = self.map.get_adjacent_territories(army.location)
                     if available_territories:
-                        destination = random.choice(available_territories)
-                        player.move_unit(army, destination)
+                        destination = self.rng.ai.choice(available_territories)
+                        self.perform_action(player, 'move_unit', army, destination)
             elif action == 'build_infrastructure':
                 # Construire une infrastructure sur un territoire aléatoire
-                territory = random.choice(player.territories)
-                infra_type = random.choice(['Factory', 'Port', 'Oil Exploitation', 'Coal Factory'])
-                player.build_infrastructure(territory, infra_type)
+                territory = self.rng.ai.choice(player.territories)
+                infra_type = self.rng.ai.choice(['Factory', 'Port', 'Oil Exploitation', 'Coal Factory'])
+                self.perform_action(player, 'build_infrastructure', territory, infra_type)
             elif action == 'declare_war':
                 # Déclarer la guerre à un autre joueur
                 potential_enemies = [p for p in self.players if p != player and p not in player.war_declarations]
                 if potential_enemies:
-                    enemy = random.choice(potential_enemies)
-                    player.declare_war(enemy)
+                    enemy = self.rng.ai.choice(potential_enemies)
+                    self.perform_action(player, 'declare_war', enemy)
             elif action == 'change_ideology':
                 # Changer d'idéologie
                 ideologies = ['République', 'Royauté', 'Empire', 'Socialisme', 'Dictature']
-                new_ideology = random.choice(ideologies)
-                player.change_ideology(new_ideology)
+                new_ideology = self.rng.ai.choice(ideologies)
+                self.perform_action(player, 'change_ideology', new_ideology)
 
     def check_victory_conditions(self, player):
         """Vérifie si un joueur a rempli une condition de victoire."""
+        if self.leaderboard is None or len(self.leaderboard.players) != len(self.players):
+            self.leaderboard = Leaderboard(self.players)
         # Conditions de victoire
-        largest_army = max(self.players, key=lambda p: len(p.armies))
-        largest_navy = max(self.players, key=lambda p: len(p.fleets))
-        largest_territory = max(self.players, key=lambda p: p.get_total_territory_size())
-        richest = max(self.players, key=lambda p: p.resources['money'])
+        for condition in Leaderboard.CONDITIONS:
+            self.victory_conditions[condition] = self.leaderboard.leader(condition)
 
-        if player == largest_army and player == largest_navy and player == largest_territory and player == richest:
-            print(f"\n{player.name} a rempli toutes les conditions de victoire !")
+        if all(leader == player for leader in self.victory_conditions.values()):
+            self.log('victory', f"\n{player.name} a rempli toutes les conditions de victoire !", player=player)
             return True
         return False
 
     def end_game(self):
-        """Termine la partie et affiche les résultats."""
-        print("\nLa partie est terminée.")
+        """Termine la partie, affiche les résultats et retourne un résumé compact de la partie."""
+        self.log('game_end', "\nLa partie est terminée.")
         # Déterminer le vainqueur selon les conditions de victoire
         winner = max(self.players, key=lambda p: (
-            len(p.armies),
+            p.soldier_count,
             len(p.fleets),
             p.get_total_territory_size(),
             p.resources['money']
         ))
-        print(f"Le gagnant est {winner.name} !")
-        print("Merci d'avoir joué à Baguette Risque.")
+        self.log('game_end', f"Le gagnant est {winner.name} !", player=winner, outcome='winner')
+        self.log('game_end', "Merci d'avoir joué à Baguette Risque.", level=logging.DEBUG)
+        self.game_log.flush()
+        return {
+            'winner': winner.player_id,
+            'turns': self.current_turn - 1,
+            'victory': 'conditions' if self.is_game_over else 'max_turns',
+            'victory_conditions': {
+                condition: leader.player_id if leader else None
+                for condition, leader in self.victory_conditions.items()
+            },
+        }
 
-    def save_game_state(self):
-        """Sauvegarde l'état actuel du jeu (fonctionnalité optionnelle)."""
-        # Implémentation pour sauvegarder l'état du jeu
-        pass
+    def save_game_state(self, path):
+        """Sauvegarde l'état actuel du jeu dans un fichier (voir SnapshotWriter)."""
+        with open(path, 'wb') as file:
+            SnapshotWriter(file).write(self)
 
-    def load_game_state(self):
-        """Charge un état de jeu précédemment sauvegardé (fonctionnalité optionnelle)."""
-        # Implémentation pour charger un état du jeu
-        pass
+    def load_game_state(self, path):
+        """Remplace l'état du jeu par celui d'un fichier sauvegardé par save_game_state."""
+        with open(path, 'rb') as file:
+            SnapshotReader(file).read(self)
+        self.object_index = {}
+        for player in self.players:
+            player.flag = None if player.headless else Image.open(player.flag_image_path)
+
+
+class StateDelta:
+    """Delta inverse d'une action : l'état d'avant des seuls objets qu'elle peut modifier.
+
+    Les attributs de chaque objet sont copiés superficiellement (listes, dictionnaires et ensembles
+    compris) ; restore les remet en place sans changer l'identité des conteneurs. Le coût est
+    proportionnel aux objets touchés par l'action, pas à la taille de la partie.
+    """
+    def __init__(self, game):
+        world = game.map.world
+        self.world = world  # Colonnes des territoires et infrastructures
+        self.counts = (world.count, world.infrastructure_count)  # Lignes créées par l'action à oublier
+        self.rows = []  # (indice, valeurs des colonnes) des territoires touchés
+        self.states = []  # (objet, [(attribut, valeur, contenu d'avant)])
+        self.saved = set()  # id() des objets déjà sauvegardés
+        self.game = game
+        self.action_count = len(game.action_log)  # Actions journalisées avant l'action
+        self.random_states = [(getattr(game.rng, name), getattr(game.rng, name).getstate())
+                              for name in RandomStreams.NAMES]
+        if game.leaderboard is not None:
+            self.save(game.leaderboard)
+
+    def save(self, obj):
+        """Sauvegarde les attributs d'un objet et ses IndexedSet (une seule fois par delta)."""
+        if obj is None or id(obj) in self.saved:
+            return
+        self.saved.add(id(obj))
+        names = obj.__dict__ if hasattr(obj, '__dict__') else obj.__slots__
+        attributes = []
+        for name in names:
+            value = getattr(obj, name)
+            if isinstance(value, (list, dict, set)):
+                attributes.append((name, value, value.copy()))
+            else:
+                attributes.append((name, value, None))
+                if isinstance(value, IndexedSet):
+                    self.save(value)
+        self.states.append((obj, attributes))
+
+    def save_territory(self, territory):
+        """Sauvegarde un territoire, ses armées et ses colonnes dans le WorldState."""
+        if id(territory) in self.saved:
+            return
+        self.save(territory)
+        for army in territory.armies:
+            self.save(army)
+        if territory.world is self.world:
+            self.rows.append((territory.index, [
+                getattr(self.world, column)[territory.index] for column in WorldState.COLUMNS
+            ]))
+
+    def save_army(self, army):
+        """Sauvegarde une armée, son joueur et les territoires où elle peut aller ou reculer."""
+        self.save(army)
+        self.save(army.owner)
+        if army.location is not None:
+            self.save_territory(army.location)
+            for territory in army.location.adjacent_territories:
+                self.save_territory(territory)
+
+    def save_fleet(self, fleet):
+        """Sauvegarde une flotte, son joueur et sa zone maritime."""
+        self.save(fleet)
+        self.save(fleet.owner)
+        self.save(fleet.location)
+
+    def restore(self):
+        """Remet la partie dans l'état d'avant l'action."""
+        for obj, attributes in reversed(self.states):
+            for name, value, contents in attributes:
+                if isinstance(value, list):
+                    value[:] = contents
+                elif contents is not None:
+                    value.clear()
+                    value.update(contents)
+                setattr(obj, name, value)
+        for index, values in self.rows:
+            for column, value in zip(WorldState.COLUMNS, values):
+                getattr(self.world, column)[index] = value
+        self.world.count, self.world.infrastructure_count = self.counts
+        for stream, state in self.random_states:
+            stream.setstate(state)
+        del self.game.action_log[self.action_count:]
+
+
+class ActionHistory:
+    """Couche de commandes au-dessus de Game.perform_action, pour annuler et refaire des actions.
+
+    Avant chaque action, un StateDelta sauvegarde les objets qu'elle peut modifier (joueur,
+    unités, territoires de départ, d'arrivée et de repli, zones maritimes, flux aléatoires,
+    classement) : annuler ne coûte que la taille de ce qui a changé, sans copier la partie.
+    Refaire rejoue l'action depuis l'état restauré (flux aléatoires compris), donc à l'identique.
+    Les événements déjà écrits dans le journal de la partie ne sont pas effacés.
+    """
+    def __init__(self, game):
+        self.game = game
+        self.done = []  # (delta inverse, joueur, action, arguments) des actions jouées
+        self.undone = []  # (joueur, action, arguments) des actions annulées, à refaire
+
+    def capture(self, player, action, arguments):
+        """Retourne le delta inverse d'une action avant qu'elle soit jouée."""
+        delta = StateDelta(self.game)
+        delta.save(player)
+        for argument in arguments:
+            if isinstance(argument, Army):
+                delta.save_army(argument)
+            elif isinstance(argument, Fleet):
+                delta.save_fleet(argument)
+            elif isinstance(argument, Player):
+                delta.save(argument)
+            elif isinstance(argument, Territory):
+                delta.save_territory(argument)
+                for sea_zone in argument.adjacent_sea_zones:
+                    delta.save(sea_zone)
+            elif isinstance(argument, SeaZone):
+                delta.save(argument)
+        if action == 'colonize':
+            # La flotte utilisée est choisie par le joueur parmi les siennes
+            for fleet in player.fleets:
+                delta.save_fleet(fleet)
+        elif action in ('change_ideology', 'change_military_spending'):
+            # Les effets d'idéologie réécrivent l'entretien de toutes les unités du joueur
+            for army in player.armies:
+                delta.save(army)
+            for fleet in player.fleets:
+                delta.save(fleet)
+        return delta
+
+    def perform(self, player, action, *arguments):
+        """Joue une action en gardant de quoi l'annuler ; vide les actions à refaire."""
+        self.undone.clear()
+        return self.execute(player, action, arguments)
+
+    def execute(self, player, action, arguments):
+        delta = self.capture(player, action, arguments)
+        result = self.game.perform_action(player, action, *arguments)
+        self.done.append((delta, player, action, arguments))
+        return result
+
+    def undo(self):
+        """Annule la dernière action jouée ; retourne False s'il n'y en a pas."""
+        if not self.done:
+            return False
+        delta, *command = self.done.pop()
+        delta.restore()
+        self.undone.append(command)
+        return True
+
+    def redo(self):
+        """Rejoue la dernière action annulée ; retourne False s'il n'y en a pas."""
+        if not self.undone:
+            return False
+        player, action, arguments = self.undone.pop()
+        self.execute(player, action, arguments)
+        return True
+
+    def rollback(self, length):
+        """Annule les actions jouées jusqu'à n'en garder que length (pour essayer puis revenir)."""
+        while len(self.done) > length:
+            self.undo()
+
+    def __len__(self):
+        return len(self.done)
+
+
+SNAPSHOT_MAGIC = b'BRSNAP'  # Signature des fichiers de sauvegarde
+SNAPSHOT_VERSION = 2  # Version du format de sauvegarde
+TRANSIENT_ATTRIBUTES = {'Player': ('flag',), 'Game': ('object_index',)}  # Attributs non sauvegardés, par classe
+SNAPSHOT_GLOBALS = {  # Objets hors de ce module qu'une sauvegarde peut recréer (module, nom)
+    ('collections', 'OrderedDict'), ('collections', 'deque'), ('operator', 'attrgetter'), ('random', 'Random'),
+    ('numpy', 'dtype'), ('numpy', 'ndarray'),
+    ('numpy._core.numeric', '_frombuffer'), ('numpy.core.numeric', '_frombuffer'),
+    ('numpy._core.multiarray', '_reconstruct'), ('numpy.core.multiarray', '_reconstruct'),
+    ('numpy._core.multiarray', 'scalar'), ('numpy.core.multiarray', 'scalar')
+}
+SNAPSHOT_MODULE_GLOBALS = {  # Objets de ce module qu'une sauvegarde peut recréer
+    'IndexedSet', 'EmptyIndexedSet', 'NO_UNITS', 'RandomStreams', 'WorldState', 'DetachedWorldState',
+    'UntrackedTerritories', 'Map', 'PathFinder', 'EventLog', 'Leaderboard'
+}
+
+
+def get_snapshot_state(obj):
+    """Retourne les attributs d'un objet du jeu à sauvegarder."""
+    if hasattr(obj, '__dict__'):
+        state = dict(obj.__dict__)
+    else:
+        state = {name: getattr(obj, name) for name in obj.__slots__}
+    for name in TRANSIENT_ATTRIBUTES.get(type(obj).__name__, ()):
+        state.pop(name, None)
+    return state
+
+
+class SnapshotWriter(pickle.Pickler):
+    """Écrit l'état complet d'une partie dans un format binaire versionné, en flux.
+
+    Chaque objet du jeu (joueur, territoire, zone maritime, armée, flotte, infrastructure) est écrit
+    une seule fois, dans son propre enregistrement, et les références entre objets ne sont que des
+    identifiants : l'écriture ne suit jamais récursivement le graphe, même sur une très grande carte.
+    Format : signature, version, puis un flux pickle (en-tête, racine, enregistrements, None).
+    """
+    def __init__(self, file):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.file = file
+        self.ids = {}  # id(objet) -> identifiant dans la sauvegarde
+        self.pending = deque()  # Objets référencés pas encore écrits
+
+    def persistent_id(self, obj):
+        class_name = type(obj).__name__
+        if SNAPSHOT_CLASSES.get(class_name) is not type(obj):
+            return None
+        if id(obj) not in self.ids:
+            self.ids[id(obj)] = len(self.ids)
+            self.pending.append(obj)
+        return class_name, self.ids[id(obj)]
+
+    def write(self, game):
+        """Écrit la partie et tous les objets qu'elle référence (flux aléatoires compris)."""
+        self.file.write(SNAPSHOT_MAGIC + struct.pack('<H', SNAPSHOT_VERSION))
+        self.dump({'seed': game.rng.seed})
+        self.dump(game)
+        while self.pending:
+            obj = self.pending.popleft()
+            self.dump((self.ids[id(obj)], get_snapshot_state(obj)))
+        self.dump(None)
+
+
+class SnapshotReader(pickle.Unpickler):
+    """Relit une sauvegarde écrite par SnapshotWriter."""
+    def __init__(self, file):
+        super().__init__(file)
+        self.file = file
+        self.objects = {}  # Identifiant dans la sauvegarde -> objet recréé
+
+    def persistent_load(self, pid):
+        class_name, object_id = pid
+        if object_id not in self.objects:
+            cls = SNAPSHOT_CLASSES.get(class_name)
+            if cls is None:
+                raise pickle.UnpicklingError(f"Classe inconnue dans la sauvegarde : {class_name}.")
+            self.objects[object_id] = cls.__new__(cls)
+        return self.objects[object_id]
+
+    def find_class(self, module, name):
+        # Une sauvegarde modifiée ne doit pas pouvoir faire appeler n'importe quelle fonction au chargement
+        if (module, name) in SNAPSHOT_GLOBALS or (module == __name__ and name in SNAPSHOT_MODULE_GLOBALS):
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f"Objet interdit dans une sauvegarde : {module}.{name}.")
+
+    def read(self, game=None):
+        """Recrée la partie sauvegardée (dans game si fourni) et la retourne."""
+        header = self.file.read(len(SNAPSHOT_MAGIC) + 2)
+        if header[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError("Ce fichier n'est pas une sauvegarde de Baguette Risque.")
+        version, = struct.unpack('<H', header[len(SNAPSHOT_MAGIC):])
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Version de sauvegarde non prise en charge : {version}.")
+
+        self.load()  # Métadonnées (graine de la partie)
+        if game is not None:
+            # La racine de la sauvegarde (identifiant 0) est restaurée dans la partie existante
+            self.objects[0] = game
+        root = self.load()
+        record = self.load()
+        while record is not None:
+            object_id, state = record
+            obj = self.objects[object_id]
+            for name, value in state.items():
+                setattr(obj, name, value)
+            record = self.load()
+        return root
+
+
+SNAPSHOT_CLASSES = {
+    cls.__name__: cls for cls in (Game, Player, Territory, SeaZone, Army, Fleet, Infrastructure)
+}
+
+
+def simulate_many(n_games, seed=None, player_names=("Alice", "Bob", "Charlie"), max_turns=10000):
+    """Joue n_games parties headless à la suite et retourne la liste de leurs résultats."""
+    results = []
+    for game_index in range(n_games):
+        # Chaque partie a sa propre graine pour pouvoir être rejouée isolément
+        game_seed = seed + game_index if seed is not None else None
+        # Seuls les avertissements sont journalisés : le résumé de la partie suffit en masse
+        game = Game(headless=True, max_turns=max_turns, log_level=logging.WARNING, seed=game_seed)
+        for name in player_names:
+            game.add_player(name=name, color=None, flag_image_path=None)
+        game.setup_game()
+        results.append(game.start_game())
+    return results
+
+
+def summarize_results(results):
+    """Agrège une liste de résultats de parties en un résumé compact."""
+    summary = {
+        'games': 0,
+        'total_turns': 0,
+        'wins': {},
+        'victories': {},
+        'condition_leaders': {}
+    }
+    for result in results:
+        summary['games'] += 1
+        summary['total_turns'] += result['turns']
+        summary['wins'][result['winner']] = summary['wins'].get(result['winner'], 0) + 1
+        summary['victories'][result['victory']] = summary['victories'].get(result['victory'], 0) + 1
+        for condition, leader in result['victory_conditions'].items():
+            leaders = summary['condition_leaders'].setdefault(condition, {})
+            leaders[leader] = leaders.get(leader, 0) + 1
+    return summary
+
+
+def merge_summaries(summaries):
+    """Fusionne les résumés produits par plusieurs lots de parties."""
+    merged = summarize_results([])
+    for summary in summaries:
+        merged['games'] += summary['games']
+        merged['total_turns'] += summary['total_turns']
+        for key in ('wins', 'victories'):
+            for name, count in summary[key].items():
+                merged[key][name] = merged[key].get(name, 0) + count
+        for condition, leaders in summary['condition_leaders'].items():
+            merged_leaders = merged['condition_leaders'].setdefault(condition, {})
+            for leader, count in leaders.items():
+                merged_leaders[leader] = merged_leaders.get(leader, 0) + count
+    return merged
+
+
+def _simulate_chunk(chunk):
+    """Joue un lot de parties dans un processus de travail et n'en renvoie que le résumé."""
+    n_games, seed, player_names, max_turns = chunk
+    return summarize_results(simulate_many(n_games, seed, player_names, max_turns))
+
+
+def run_monte_carlo(n_games, seed=0, player_names=("Alice", "Bob", "Charlie"), max_turns=10000,
+                    workers=None, chunk_size=50):
+    """Répartit n_games parties headless sur un pool de processus et agrège les statistiques.
+
+    La partie numéro i utilise toujours la graine seed + i : le résultat ne dépend ni du nombre
+    de processus ni de la taille des lots.
+    """
+    chunks = [
+        (min(chunk_size, n_games - start), seed + start, tuple(player_names), max_turns)
+        for start in range(0, n_games, chunk_size)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        summary = merge_summaries(executor.map(_simulate_chunk, chunks))
+
+    summary['mean_turns'] = summary['total_turns'] / summary['games'] if summary['games'] else 0
+    summary['win_rates'] = {
+        player_id: wins / summary['games'] for player_id, wins in summary['wins'].items()
+    }
+    return summary
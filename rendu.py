@@ -0,0 +1,212 @@
+import math
+
+import numpy as np
+import pygame
+
+
+class Rendu:
+    # Redessine seulement les zones de l'écran qui ont changé (territoires repeints, unités déplacées,
+    # boutons survolés...) et n'envoie qu'elles à l'affichage. Sans zone à redessiner, aucun dessin
+    # n'est fait et la boucle attend au rythme réduit de images_par_seconde_au_repos.
+    def __init__(self, écran, images_par_seconde=60, images_par_seconde_au_repos=10):
+        self.écran = écran
+        self.horloge = pygame.time.Clock()
+        self.images_par_seconde = images_par_seconde
+        self.images_par_seconde_au_repos = images_par_seconde_au_repos
+        self.scène = None  # Fonction scène(surface, zone) qui dessine la scène dans une zone de l'écran
+        self.zones_sales = []
+
+    def changer_de_scène(self, scène):
+        self.scène = scène
+        self.tout_salir()
+
+    def salir(self, zone):
+        zone = pygame.Rect(zone).clip(self.écran.get_rect())
+        if zone.width and zone.height:
+            self.zones_sales.append(zone)
+
+    def tout_salir(self):
+        self.zones_sales = [self.écran.get_rect()]
+
+    def déplacer(self, ancienne_zone, nouvelle_zone):
+        # Un élément qui bouge salit sa place d'avant et sa place d'après
+        self.salir(ancienne_zone)
+        self.salir(nouvelle_zone)
+
+    def gérer_événement(self, event):
+        if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+            self.tout_salir()
+
+    def rendre(self):
+        if not self.zones_sales or self.scène is None:
+            self.horloge.tick(self.images_par_seconde_au_repos)
+            return False
+        zones = fusionner_zones(self.zones_sales, self.écran.get_rect())
+        self.zones_sales = []
+        for zone in zones:
+            self.écran.set_clip(zone)
+            self.scène(self.écran, zone)
+        self.écran.set_clip(None)
+        pygame.display.update(zones)
+        self.horloge.tick(self.images_par_seconde)
+        return True
+
+
+class CalquesCarte:
+    # Carte affichée en trois calques : le fond mis à l'échelle une seule fois, les couleurs des
+    # territoires (recalculées seulement là où la propriété des pixels a changé) et les icônes
+    # (unités, infrastructures). Le fond et les territoires sont gardés pré-composés dans
+    # carte_colorée : dessiner une zone ne coûte qu'une copie de cette surface et les icônes de la zone.
+    # Pour les clics et le survol, étiquettes donne le territoire sous chaque pixel de l'écran et les
+    # icônes sont rangées dans une grille de cases : trouver ce qui est sous la souris est en O(1).
+    # Un territoire survolé ou sélectionné est mis en surbrillance, une icône sélectionnée est encadrée.
+    def __init__(self, fond, taille, opacité_territoires=110, salir=None, taille_case=64):
+        self.taille = taille
+        self.fond = pygame.transform.smoothscale(fond, taille) if fond.get_size() != taille else fond.copy()
+        self.territoires = pygame.Surface(taille, pygame.SRCALPHA)
+        self.carte_colorée = self.fond.copy()
+        self.opacité_territoires = opacité_territoires
+        self.étiquettes = np.zeros((taille[1], taille[0]), dtype=np.uint16)  # Territoire sous chaque pixel (0 : aucun)
+        self.icônes = {}  # Clé -> (image, rectangle à l'écran, ordre d'affichage)
+        self.ordre = 0  # Les icônes placées en dernier sont dessinées au-dessus
+        self.taille_case = taille_case
+        self.grille = {}  # (colonne, ligne) -> clés des icônes qui touchent la case
+        self.zones_des_territoires = [None]  # Rectangle à l'écran qui contient chaque territoire
+        self.surbrillances = {}  # Nom (survol, sélection...) -> (territoire, image, rectangle)
+        self.icône_sélectionnée = None  # Clé de l'icône encadrée
+        self.salir = salir  # Fonction appelée avec chaque zone de l'écran à redessiner (Rendu.salir)
+
+    def signaler(self, zone):
+        if self.salir is not None:
+            self.salir(zone)
+
+    def mettre_à_jour_territoires(self, carte):
+        # Reporte les zones repeintes de la carte (classes.Map) sur le calque des territoires
+        zones = carte.zones_modifiées
+        carte.zones_modifiées = []
+        for x, y, largeur, hauteur in carte.zones_des_territoires[len(self.zones_des_territoires):]:
+            self.zones_des_territoires.append(self.zone_à_l_écran(carte, x, y, largeur, hauteur))
+        if not zones:
+            return
+        palette = np.zeros((len(carte.propriétaires_des_territoires), 4), dtype=np.uint8)
+        for numéro, joueur in enumerate(carte.propriétaires_des_territoires[1:], start=1):
+            palette[numéro] = (*pygame.Color(joueur.couleur)[:3], self.opacité_territoires)
+        échelle_x, échelle_y = self.taille[0] / carte.largeur, self.taille[1] / carte.hauteur
+        for x, y, largeur, hauteur in zones:
+            zone = self.zone_à_l_écran(carte, x, y, largeur, hauteur)
+            if not zone.width or not zone.height:
+                continue
+            # Pixel de la carte au centre de chaque pixel de l'écran
+            colonnes = ((np.arange(zone.left, zone.right) + 0.5) / échelle_x).astype(np.intp)
+            lignes = ((np.arange(zone.top, zone.bottom) + 0.5) / échelle_y).astype(np.intp)
+            étiquettes = carte.territoires[np.ix_(lignes, colonnes)]
+            self.étiquettes[zone.top:zone.bottom, zone.left:zone.right] = étiquettes
+            couleurs = palette[étiquettes].transpose(1, 0, 2)
+            pygame.surfarray.pixels3d(self.territoires)[zone.left:zone.right, zone.top:zone.bottom] = couleurs[..., :3]
+            pygame.surfarray.pixels_alpha(self.territoires)[zone.left:zone.right, zone.top:zone.bottom] = couleurs[..., 3]
+            self.carte_colorée.blit(self.fond, zone, zone)
+            self.carte_colorée.blit(self.territoires, zone, zone)
+            self.signaler(zone)
+
+    def zone_à_l_écran(self, carte, x, y, largeur, hauteur):
+        # Rectangle de l'écran qui couvre un rectangle de la carte
+        échelle_x, échelle_y = self.taille[0] / carte.largeur, self.taille[1] / carte.hauteur
+        zone = pygame.Rect(math.floor(x * échelle_x), math.floor(y * échelle_y), 0, 0)
+        zone.width = math.ceil((x + largeur) * échelle_x) - zone.x
+        zone.height = math.ceil((y + hauteur) * échelle_y) - zone.y
+        return zone.clip(self.territoires.get_rect())
+
+    def surligner(self, nom, numéro, couleur=(255, 255, 255, 70)):
+        # Met un territoire en surbrillance (0 : aucun) ; nom sépare les surbrillances (survol, sélection)
+        ancienne = self.surbrillances.get(nom)
+        if ancienne is not None and ancienne[0] == numéro:
+            return
+        if ancienne is not None:
+            del self.surbrillances[nom]
+            self.signaler(ancienne[2])
+        if not 0 < numéro < len(self.zones_des_territoires):
+            return
+        zone = self.zones_des_territoires[numéro]
+        if not zone.width or not zone.height:
+            return
+        image = pygame.Surface(zone.size, pygame.SRCALPHA)
+        image.fill(couleur)
+        masque = self.étiquettes[zone.top:zone.bottom, zone.left:zone.right] == numéro
+        pygame.surfarray.pixels_alpha(image)[:] = masque.T * np.uint8(couleur[3])
+        self.surbrillances[nom] = (numéro, image, zone)
+        self.signaler(zone)
+
+    def sélectionner_icône(self, clé):
+        # Encadre une icône (None : aucune)
+        for ancienne in (self.icône_sélectionnée, clé):
+            if ancienne in self.icônes:
+                self.signaler(self.icônes[ancienne][1])
+        self.icône_sélectionnée = clé
+
+    def cases(self, rectangle):
+        for colonne in range(rectangle.left // self.taille_case, (rectangle.right - 1) // self.taille_case + 1):
+            for ligne in range(rectangle.top // self.taille_case, (rectangle.bottom - 1) // self.taille_case + 1):
+                yield colonne, ligne
+
+    def placer_icône(self, clé, image, centre):
+        self.retirer_icône(clé)
+        rectangle = image.get_rect(center=centre)
+        self.ordre += 1
+        self.icônes[clé] = (image, rectangle, self.ordre)
+        for case in self.cases(rectangle):
+            self.grille.setdefault(case, {})[clé] = None  # Dictionnaire : garde l'ordre d'ajout
+        self.signaler(rectangle)
+
+    def retirer_icône(self, clé):
+        ancienne = self.icônes.pop(clé, None)
+        if ancienne is not None:
+            for case in self.cases(ancienne[1]):
+                del self.grille[case][clé]
+            self.signaler(ancienne[1])
+
+    def territoire_à(self, position):
+        # Numéro du territoire (classes.Map) sous un point de l'écran, 0 si aucun
+        x, y = position
+        if 0 <= x < self.taille[0] and 0 <= y < self.taille[1]:
+            return int(self.étiquettes[y, x])
+        return 0
+
+    def icône_à(self, position):
+        # Clé de l'icône dessinée au-dessus des autres sous un point de l'écran, None si aucune
+        trouvée = None
+        for clé in self.grille.get((position[0] // self.taille_case, position[1] // self.taille_case), ()):
+            if self.icônes[clé][1].collidepoint(position):
+                trouvée = clé
+        return trouvée
+
+    def dessiner(self, surface, zone):
+        # Scène pour Rendu : compose les calques dans une zone de l'écran
+        surface.blit(self.carte_colorée, zone, zone)
+        for _, image, rectangle in self.surbrillances.values():
+            if rectangle.colliderect(zone):
+                surface.blit(image, rectangle)
+        icônes = {}
+        for case in self.cases(zone):
+            for clé in self.grille.get(case, ()):
+                icônes[clé] = self.icônes[clé]
+        for image, rectangle, _ in sorted(icônes.values(), key=lambda icône: icône[2]):
+            if rectangle.colliderect(zone):
+                surface.blit(image, rectangle)
+        if self.icône_sélectionnée in self.icônes:
+            pygame.draw.rect(surface, (255, 255, 255), self.icônes[self.icône_sélectionnée][1], 2)
+
+
+def fusionner_zones(zones, écran, part_maximale=0.5):
+    # Réunit les zones qui se chevauchent ; au-delà de part_maximale de l'écran, tout est redessiné d'un coup
+    fusionnées = []
+    for zone in zones:
+        zone = zone.copy()
+        chevauchements = zone.collidelistall(fusionnées)
+        while chevauchements:
+            for indice in reversed(chevauchements):
+                zone.union_ip(fusionnées.pop(indice))
+            chevauchements = zone.collidelistall(fusionnées)
+        fusionnées.append(zone)
+    if sum(zone.width * zone.height for zone in fusionnées) > part_maximale * écran.width * écran.height:
+        return [écran.copy()]
+    return fusionnées
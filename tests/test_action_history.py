@@ -0,0 +1,69 @@
+import logging
+
+from models import ActionHistory, Game
+
+
+def make_game(seed=7):
+    game = Game(headless=True, max_turns=10, log_level=logging.WARNING, seed=seed)
+    for name in ("Alice", "Bob"):
+        game.add_player(name=name, color=None, flag_image_path=None)
+    game.setup_game()
+    return game
+
+
+def player_state(player):
+    return (
+        player.ideology,
+        player.unit_upkeep,
+        player.soldier_production,
+        player.military_spending_level,
+        dict(player.resources),
+        dict(player.action_points),
+        [(army.army_id, army.upkeep_cost, army.strength) for army in player.armies],
+        [(fleet.fleet_id, fleet.upkeep_cost) for fleet in player.fleets],
+        player.calculate_expenses(),
+    )
+
+
+def test_undo_redo_change_ideology_restores_unit_upkeep():
+    game = make_game()
+    player = game.players[0]
+    assert player.armies or player.fleets
+    history = ActionHistory(game)
+    before = player_state(player)
+
+    history.perform(player, 'change_ideology', 'Socialisme')
+    after = player_state(player)
+    assert after != before
+
+    assert history.undo()
+    assert player_state(player) == before
+    assert history.redo()
+    assert player_state(player) == after
+
+
+def test_undo_change_military_spending_restores_player():
+    game = make_game()
+    player = game.players[1]
+    history = ActionHistory(game)
+    before = player_state(player)
+
+    history.perform(player, 'change_military_spending', 4)
+    assert history.undo()
+    assert player_state(player) == before
+
+
+def test_undo_build_infrastructure_restores_territory():
+    game = make_game()
+    player = game.players[0]
+    player.add_money(10000)
+    territory = player.territories[0]
+    history = ActionHistory(game)
+    infrastructures = list(territory.infrastructures)
+    money = player.resources['money']
+
+    history.perform(player, 'build_infrastructure', territory, 'Factory')
+    assert len(territory.infrastructures) == len(infrastructures) + 1
+    assert history.undo()
+    assert list(territory.infrastructures) == infrastructures
+    assert player.resources['money'] == money
@@ -0,0 +1,42 @@
+import logging
+
+from agents import GreedyAgent
+from models import Game
+
+
+def make_game(seed=11, agents=True):
+    game = Game(headless=True, max_turns=20, log_level=logging.WARNING, seed=seed)
+    for name in ("Alice", "Bob", "Charlie"):
+        game.add_player(name=name, color=None, flag_image_path=None)
+    game.setup_game()
+    if agents:
+        for player in game.players:
+            game.agents[player.player_id] = GreedyAgent()
+    return game
+
+
+def recorded_game():
+    game = make_game()
+    game.start_game()
+    return list(game.action_log), list(game.turn_digests)
+
+
+def test_replay_matches_recording():
+    actions, digests = recorded_game()
+    replayed = make_game(agents=False)
+    replayed.replay(actions, digests)
+    assert replayed.divergent_turn is None
+    assert replayed.turn_digests == digests
+
+
+def test_replay_reports_missing_unit_as_divergence():
+    actions, digests = recorded_game()
+    index = next(i for i, (_, _, _, arguments) in enumerate(actions)
+                 if any(isinstance(a, tuple) and a[0] == 'army' for a in arguments))
+    turn, player_id, action, arguments = actions[index]
+    actions[index] = (turn, player_id, action, tuple(
+        ('army', a[1], 'unknown_army') if isinstance(a, tuple) and a[0] == 'army' else a for a in arguments
+    ))
+    replayed = make_game(agents=False)
+    replayed.replay(actions, digests)
+    assert replayed.divergent_turn == turn
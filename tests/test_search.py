@@ -0,0 +1,57 @@
+import io
+import logging
+from functools import reduce
+from operator import xor
+
+from agents import MCTSAgent, SearchPickler, SearchUnpickler, ZobristHasher
+from models import Game, position_key
+
+
+def make_game(seed=3):
+    game = Game(headless=True, max_turns=10, log_level=logging.WARNING, seed=seed)
+    for name in ("Alice", "Bob", "Charlie"):
+        game.add_player(name=name, color=None, flag_image_path=None)
+    game.setup_game()
+    return game
+
+
+def search_copy(game, seed=1):
+    file = io.BytesIO()
+    pickler = SearchPickler(file, game)
+    pickler.dump(game)
+    return SearchUnpickler(io.BytesIO(file.getvalue()), pickler.shared, seed).load()
+
+
+def test_search_copies_share_path_caches_with_their_own_territories():
+    game = make_game()
+    copy = search_copy(game)
+    assert copy.map.territory_paths.searches is game.map.territory_paths.searches
+    assert copy.map.sea_paths.searches is game.map.sea_paths.searches
+
+    source, destination = copy.map.territories[0], copy.map.territories[-1]
+    path = copy.map.territory_paths.path(source, destination)
+    assert path[0] is source and path[-1] is destination
+    assert all(territory in copy.map.territories for territory in path)
+    assert copy.rng is not game.rng
+
+
+def test_territory_key_follows_ownership_and_keeps_hashes_equal():
+    game = make_game()
+    player, other = game.players[0], game.players[1]
+    territory = game.map.free_territories[0]
+    territory.change_owner(player)
+    territory.change_owner(other)
+    for each in game.players:
+        assert each.territory_key == reduce(xor, (position_key(t.territory_id) for t in each.territories), 0)
+
+    hasher = ZobristHasher(5)
+    copy = search_copy(game)
+    assert hasher.hash(copy, copy.players[0]) == hasher.hash(game, player)
+
+
+def test_mcts_decision_runs_on_shared_caches():
+    game = make_game()
+    agent = MCTSAgent(iterations=20, time_budget=None, seed=1)
+    searches = game.map.territory_paths.searches
+    agent.decide(game, game.players[0])
+    assert game.map.territory_paths.searches is searches
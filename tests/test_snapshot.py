@@ -0,0 +1,38 @@
+import io
+import logging
+import pickle
+import struct
+
+import pytest
+
+from models import SNAPSHOT_MAGIC, SNAPSHOT_VERSION, Game, SnapshotReader
+
+
+class Payload:
+    def __reduce__(self):
+        return (print, ("chargé",))
+
+
+def test_save_and_load_round_trip(tmp_path):
+    game = Game(headless=True, max_turns=10, log_level=logging.WARNING, seed=5)
+    for name in ("Alice", "Bob"):
+        game.add_player(name=name, color=None, flag_image_path=None)
+    game.setup_game()
+    game.start_game()
+    path = tmp_path / "partie.bin"
+    game.save_game_state(path)
+
+    loaded = Game(headless=True, log_level=logging.WARNING)
+    loaded.load_game_state(path)
+    assert [p.resources for p in loaded.players] == [p.resources for p in game.players]
+    assert [len(p.territories) for p in loaded.players] == [len(p.territories) for p in game.players]
+
+
+def test_load_rejects_unknown_globals():
+    file = io.BytesIO()
+    file.write(SNAPSHOT_MAGIC + struct.pack('<H', SNAPSHOT_VERSION))
+    pickle.dump({'seed': 1}, file)
+    pickle.dump(Payload(), file)
+    file.seek(0)
+    with pytest.raises(pickle.UnpicklingError):
+        SnapshotReader(file).read()
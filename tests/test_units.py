@@ -0,0 +1,37 @@
+import logging
+
+from models import Fleet, Game
+
+
+def make_game(seed=7):
+    game = Game(headless=True, max_turns=10, log_level=logging.WARNING, seed=seed)
+    for name in ("Alice", "Bob"):
+        game.add_player(name=name, color=None, flag_image_path=None)
+    game.setup_game()
+    return game
+
+
+def test_transported_armies_leave_their_territory_and_survive_next_turn():
+    game = make_game()
+    player = game.players[0]
+    army = player.armies[0]
+    territory = army.location
+    detachment = army.split(1)
+    sea_zone = game.map.sea_zones[0]
+    fleet = Fleet('test_fleet', player, sea_zone, ships=5)
+    player.add_fleet(fleet)
+    sea_zone.add_fleet(fleet)
+    soldiers = player.soldier_count
+
+    fleet.transport_armies([army, detachment])
+    assert army not in territory.armies and detachment not in territory.armies
+    assert army.location is sea_zone and detachment.location is sea_zone
+    assert player.soldier_count == soldiers
+
+    player.next_turn()
+    assert army in player.armies and detachment in player.armies
+
+    fleet.unload_armies(territory)
+    player.next_turn()
+    assert len([a for a in territory.armies if a.owner is player]) == 1
+    assert player.soldier_count == sum(a.strength for a in player.armies)
@@ -1,3 +1,6 @@
+from collections import OrderedDict
+from functools import lru_cache
+
 import pygame
 pygame.init()
 class Button:
@@ -34,9 +37,10 @@ class Button:
 
         W = self.text_surface.get_width()
         H = self.text_surface.get_height()
-        self.image_normal.blit(self.text_surface, ((200 * size - W) // 2, (100 * size - H) // 2))
-        self.image_highlighted.blit(self.text_surface, ((200 * size - W) // 2, (100 * size - H) // 2))
-        self.image_clicked.blit(self.text_surface, ((200 * size - W) // 2, (100 * size - H) // 2))
+        # Text and black border are baked into each state image once, drawing is then a single blit
+        for image in (self.image_normal, self.image_highlighted, self.image_clicked):
+            image.blit(self.text_surface, ((200 * size - W) // 2, (100 * size - H) // 2))
+            pygame.draw.rect(image, (0, 0, 0), image.get_rect(), 2)
 
         self.click_start = 0
         self.click_duration = 200
@@ -53,21 +57,79 @@ class Button:
                 self.image = self.image_highlighted
         return False
 
-    def draw(self, surface):
-        if self.rect.collidepoint(pygame.mouse.get_pos()):
-            if self.image != self.image_clicked or (
-                    self.image == self.image_clicked and pygame.time.get_ticks() - self.click_start > self.click_duration):
-                self.image = self.image_highlighted
+    def update(self, hovered, now):
+        # Picks the state image from the hover state; returns True if the image changed
+        if hovered:
+            if self.image is not self.image_clicked or now - self.click_start > self.click_duration:
+                image = self.image_highlighted
+            else:
+                image = self.image_clicked
         else:
-            self.image = self.image_normal
-
-        bordered_image = self.image.copy()
+            image = self.image_normal
+        changed = image is not self.image
+        self.image = image
+        return changed
+
+    def draw(self, surface, mouse_pos=None):
+        if mouse_pos is None:
+            mouse_pos = pygame.mouse.get_pos()
+        self.update(self.rect.collidepoint(mouse_pos), pygame.time.get_ticks())
+        surface.blit(self.image, self.rect)
+
+
+class ButtonGroup:
+    # Many buttons sharing one input dispatch per frame: the mouse is hit-tested through a grid of
+    # cells (only the buttons overlapping the cell under the cursor are checked) and only the buttons
+    # whose state may change (previously hovered, hovered, clicked) are updated
+    def __init__(self, buttons=(), cell_size=100):
+        self.cell_size = cell_size
+        self.buttons = []
+        self.grid = {}  # (column, row) -> buttons overlapping the cell
+        self.hovered = None
+        self.pressed = []  # Buttons showing their clicked image
+        for button in buttons:
+            self.add(button)
+
+    def add(self, button):
+        self.buttons.append(button)
+        for column in range(button.rect.left // self.cell_size, (button.rect.right - 1) // self.cell_size + 1):
+            for row in range(button.rect.top // self.cell_size, (button.rect.bottom - 1) // self.cell_size + 1):
+                self.grid.setdefault((column, row), []).append(button)
+
+    def button_at(self, pos):
+        for button in self.grid.get((pos[0] // self.cell_size, pos[1] // self.cell_size), ()):
+            if button.rect.collidepoint(pos):
+                return button
+        return None
 
-        image_rect = bordered_image.get_rect()
-
-        pygame.draw.rect(bordered_image, (0, 0, 0), image_rect, 2)
+    def handle_event(self, event):
+        # Returns the button clicked by the event, if any
+        if event.type not in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+            return None
+        button = self.button_at(event.pos)
+        if button is None:
+            return None
+        clicked = button.handle_event(event)
+        if button.image is button.image_clicked and button not in self.pressed:
+            self.pressed.append(button)
+        return button if clicked else None
+
+    def update(self, mouse_pos, now=None):
+        # Returns the buttons whose image changed, to redraw (e.g. Rendu.salir(button.rect))
+        if now is None:
+            now = pygame.time.get_ticks()
+        hovered = self.button_at(mouse_pos)
+        changed = []
+        for button in (self.hovered, hovered, *self.pressed):
+            if button is not None and button not in changed and button.update(button is hovered, now):
+                changed.append(button)
+        self.pressed = [button for button in self.pressed if button.image is button.image_clicked]
+        self.hovered = hovered
+        return changed
 
-        surface.blit(bordered_image, self.rect)
+    def draw(self, surface):
+        for button in self.buttons:
+            surface.blit(button.image, button.rect)
 
 
 color_dict = {"black": [0, 0, 0], "red": [255, 0, 0], "green": [0, 255, 0], "blue": [0, 0, 255],
@@ -78,35 +140,63 @@ color_dict = {"black": [0, 0, 0], "red": [255, 0, 0], "green": [0, 255, 0], "blu
 
 
 
+# Fonts and rendered lines are cached: HUD text redrawn every frame costs a single blit
+TEXT_CACHE_SIZE = 256
+text_cache = OrderedDict()  # (line, size, color, border) -> surface, least recently used first
+
+
+@lru_cache(maxsize=None)
+def get_font(size):
+    return pygame.font.Font(pygame.font.get_default_font(), size)
+
+
+def render_text(line, size, color, border=False):
+    key = (line, size, tuple(color), border)
+    surface = text_cache.get(key)
+    if surface is not None:
+        text_cache.move_to_end(key)
+        return surface
+
+    font = get_font(size)
+    line_surface = font.render(line, True, color)
+    if border:
+        # Pre-composite the black outline (8 shifted copies) and the fill into one surface, 1 pixel wider on each side
+        border_surface = font.render(line, True, (0, 0, 0))
+        surface = pygame.Surface((line_surface.get_width() + 2, line_surface.get_height() + 2), pygame.SRCALPHA)
+        for dx, dy in ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)):
+            surface.blit(border_surface, (dx + 1, dy + 1))
+        surface.blit(line_surface, (1, 1))
+    else:
+        surface = line_surface
+
+    text_cache[key] = surface
+    if len(text_cache) > TEXT_CACHE_SIZE:
+        text_cache.popitem(last=False)
+    return surface
+
+
 def place_text(screen, x, y, text, size, color=None, border=False, corner=False):
-    font = pygame.font.Font(pygame.font.get_default_font(), size)
     lines = text.split('\n')
 
-    # Define border and inner color
-    border_color = (0, 0, 0)  # Black color for border
+    # Define inner color
     inner_color = color if color else (255, 255, 255)  # White color for inner text
 
     for i, line in enumerate(lines):
-        # Render the text line
-        line_surface = font.render(line, True, inner_color)
+        # Get the rendered text line (outline included)
+        line_surface = render_text(line, size, inner_color, border)
+        margin = 1 if border else 0
+        line_rect = pygame.Rect(0, 0, line_surface.get_width() - 2 * margin, line_surface.get_height() - 2 * margin)
 
         # Determine position based on `corner` parameter
         if corner:
             # If `corner` is True, align text to the top-left corner based on `x` and `y`
             if corner == "opposite":
-                line_rect = line_surface.get_rect(topright=(x, y + i * size))
+                line_rect.topright = (x, y + i * size)
             else:
-                line_rect = line_surface.get_rect(topleft=(x, y + i * size))
+                line_rect.topleft = (x, y + i * size)
         else:
             # If `corner` is False, center the text as usual
-            line_rect = line_surface.get_rect(center=(x, y + i * size))
-
-        if border:
-            # Render text with border color for outline
-            for dx, dy in ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)):
-                border_line_surface = font.render(line, True, border_color)
-                border_line_rect = border_line_surface.get_rect(topleft=(line_rect.x + dx, line_rect.y + dy))
-                screen.blit(border_line_surface, border_line_rect)
+            line_rect.center = (x, y + i * size)
 
-        # Render the actual text
-        screen.blit(line_surface, line_rect)
+        # Draw the text (and its outline, shifted by the margin)
+        screen.blit(line_surface, (line_rect.x - margin, line_rect.y - margin))